@@ -0,0 +1,74 @@
+"""
+Batch generation across every code_gen generator.
+Each repo is generated in its own worker process; a failing generator is
+reported with its traceback and does not stop the others.
+"""
+
+import os, sys, time, traceback
+from collections import namedtuple
+
+from code_gen import memo
+from code_gen.generators import discover
+
+
+Result = namedtuple("Result", "name out ok detail seconds")
+
+
+def repo_dir(out_root, name):
+    """Output dir for generator name: pinion_os -> <out_root>/pinion-os."""
+    return os.path.join(out_root, name.replace("_", "-"))
+
+
+def generate(name, out, mode="write", use_cache=True):
+    """Generate one repo; never raises, returns a Result."""
+    t0 = time.perf_counter()
+    try:
+        if mode == "fast-import":
+            hit = memo.history(name, out, use_cache=use_cache)
+            detail = "history replayed from cache" if hit else "history rebuilt"
+        else:
+            written = memo.write(name, out, use_cache=use_cache)
+            detail = "cached" if written is None else "%d file(s) written" % len(written)
+        ok = True
+    except Exception:
+        ok, detail = False, traceback.format_exc()
+    return Result(name, out, ok, detail, time.perf_counter() - t0)
+
+
+def batch(out_root, names=None, jobs=None, mode="write", use_cache=True, log=print):
+    """Generate every discovered (or named) repo under out_root concurrently."""
+    names = names or discover()
+    jobs = jobs or os.cpu_count() or 1
+    results = []
+
+    def report(r):
+        results.append(r)
+        log("[%d/%d] %-24s %s %7.0f ms  %s" % (
+            len(results), len(names), r.name, "ok  " if r.ok else "FAIL",
+            r.seconds * 1e3, r.detail if r.ok else r.detail.strip().splitlines()[-1]))
+
+    args = [(name, repo_dir(out_root, name), mode, use_cache) for name in names]
+    if jobs <= 1 or len(args) <= 1:
+        for a in args:
+            report(generate(*a))
+        return results
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    with ProcessPoolExecutor(max_workers=min(jobs, len(args))) as pool:
+        futures = {pool.submit(generate, *a): a for a in args}
+        for fut in as_completed(futures):
+            name, out = futures[fut][:2]
+            try:
+                report(fut.result())
+            except Exception:
+                # the worker itself died (e.g. a crash in native code)
+                report(Result(name, out, False, traceback.format_exc(), 0.0))
+    return results
+
+
+def failures(results, out=sys.stderr):
+    """Print full tracebacks of failed repos; returns how many failed."""
+    failed = [r for r in results if not r.ok]
+    for r in failed:
+        out.write("\n== %s ==\n%s" % (r.name, r.detail))
+    return len(failed)
@@ -0,0 +1,136 @@
+"""
+Benchmarks for code_gen generators.
+Per-stage produce/write time and bytes, tracemalloc peak of a full
+evaluation, and end-to-end history build time, recorded as JSON.
+
+    python -m code_gen.bench pinion_os --json bench.json
+    python -m code_gen.bench pinion_os --compare bench.json
+"""
+
+import argparse, json, os, platform, shutil, statistics, sys, tempfile, time, tracemalloc
+
+from code_gen.fast_import import fast_import
+from code_gen.generators import load
+from code_gen.hooks import TimingReporter
+from code_gen.materialize import Manifest, write_stages
+
+
+def _timeit(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return {"min": min(times), "median": statistics.median(times)}
+
+
+def _evaluate(gen):
+    # the lazy stages, so each run builds them rather than hitting the cache
+    return [dict(files) for files in gen.iter_stages()]
+
+
+def bench_stages(gen, jobs=1):
+    """Produce and write each stage into a scratch dir; one row per stage."""
+    reporter = TimingReporter()
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = os.path.join(tmp, "repo")
+        write_stages(
+            repo, gen.iter_stages(), jobs=jobs, assets=gen.assets, hooks=reporter,
+            titles=gen.titles, manifest=Manifest(repo, os.path.join(tmp, "manifest.json")),
+        )
+    return [reporter.rows[k] for k in sorted(reporter.rows)]
+
+
+def run(name, repeat=5, jobs=1):
+    """Run every benchmark for generator name; returns the results dict."""
+    gen = load(name)
+    results = {
+        "generator": name,
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "jobs": jobs,
+        "eval_s": _timeit(lambda: _evaluate(gen), repeat),
+    }
+    tracemalloc.start()
+    _evaluate(gen)
+    results["tracemalloc_peak"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    results["stages"] = bench_stages(gen, jobs)
+    results["bytes"] = sum(r["bytes"] for r in results["stages"])
+
+    if shutil.which("git"):
+        def history():
+            with tempfile.TemporaryDirectory() as tmp:
+                fast_import(tmp, gen.iter_stages(), gen.titles, gen.assets, start=0)
+        results["history_s"] = _timeit(history, max(1, repeat // 2))
+    return results
+
+
+def _metrics(results):
+    out = {
+        "eval_s": results["eval_s"]["median"],
+        "write_s": sum(r["write_s"] for r in results["stages"]),
+        "tracemalloc_peak": results["tracemalloc_peak"],
+    }
+    if "history_s" in results:
+        out["history_s"] = results["history_s"]["median"]
+    return out
+
+
+def compare(baseline, results, threshold=1.25):
+    """Return [(metric, old, new)] for metrics that grew past threshold x."""
+    old, new = _metrics(baseline), _metrics(results)
+    return [
+        (key, old[key], new[key]) for key in sorted(new)
+        if old.get(key) and new[key] > old[key] * threshold
+    ]
+
+
+def report(results, out=sys.stdout):
+    out.write("%-6s %-36s %5s %9s %10s %10s\n" % (
+        "stage", "title", "files", "bytes", "produce_ms", "write_ms"))
+    for r in results["stages"]:
+        out.write("%-6d %-36s %5d %9d %10.3f %10.3f\n" % (
+            r["stage"], r["title"][:36], r["files"], r["bytes"],
+            r["produce_s"] * 1e3, r["write_s"] * 1e3))
+    out.write("eval %.3f ms (median of %d), tracemalloc peak %d B, %d B total\n" % (
+        results["eval_s"]["median"] * 1e3, results["repeat"],
+        results["tracemalloc_peak"], results["bytes"]))
+    if "history_s" in results:
+        out.write("full history (fast-import) %.1f ms\n" % (
+            results["history_s"]["median"] * 1e3))
+
+
+def add_arguments(p):
+    p.add_argument("generator", nargs="?", default="pinion_os")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--jobs", "-j", type=int, default=1)
+    p.add_argument("--json", help="write results to this file")
+    p.add_argument("--compare", help="baseline JSON to check for regressions")
+    p.add_argument("--threshold", type=float, default=1.25)
+
+
+def cmd_bench(args):
+    results = run(args.generator, args.repeat, args.jobs)
+    report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.threshold)
+        for key, old, new in regressions:
+            print("REGRESSION %s: %.6g -> %.6g" % (key, old, new))
+        return 1 if regressions else 0
+    return 0
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog="code_gen.bench")
+    add_arguments(p)
+    return cmd_bench(p.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
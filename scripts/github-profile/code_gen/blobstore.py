@@ -0,0 +1,78 @@
+"""
+Content-addressed blob store for generated files.
+Every body is interned by sha256, so content shared between stages or
+between snapshot versions is hashed, stored and written exactly once.
+"""
+
+import json, os
+
+from code_gen.materialize import cache_dir, iter_files, sha256_hex, to_bytes
+
+
+class BlobStore:
+    """sha256 -> bytes on disk (objects/ab/cdef...), plus named snapshots."""
+
+    def __init__(self, root=None):
+        self.root = root or cache_dir("blobs")
+        self._digests = {}
+        self.stored = 0
+        self.deduped = 0
+
+    def digest(self, content):
+        """sha256 of content, computed once per distinct body."""
+        d = self._digests.get(content)
+        if d is None:
+            d = self._digests[content] = sha256_hex(content)
+        return d
+
+    def path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], digest[2:])
+
+    def has(self, digest):
+        return os.path.exists(self.path(digest))
+
+    def put(self, content):
+        """Store content if new; return its digest."""
+        digest = self.digest(content)
+        dst = self.path(digest)
+        if os.path.exists(dst):
+            self.deduped += 1
+            return digest
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        tmp = "%s.%d.tmp" % (dst, os.getpid())
+        with open(tmp, "wb") as f:
+            f.write(to_bytes(content))
+        os.replace(tmp, dst)
+        self.stored += 1
+        return digest
+
+    def get(self, digest):
+        with open(self.path(digest), "rb") as f:
+            return f.read()
+
+    def put_tree(self, files):
+        """Intern every file; return {path: digest}."""
+        return {rel: self.put(content) for rel, content in iter_files(files)}
+
+    def put_stages(self, stages):
+        return [self.put_tree(files) for files in stages]
+
+    def save_snapshot(self, name, stages):
+        """Intern stages and record them under name; returns the stage trees."""
+        trees = self.put_stages(stages)
+        dst = os.path.join(self.root, "snapshots", name + ".json")
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        with open(dst + ".tmp", "w") as f:
+            json.dump(trees, f, indent=1, sort_keys=True)
+        os.replace(dst + ".tmp", dst)
+        return trees
+
+    def load_snapshot(self, name):
+        """Return the stage trees of a snapshot as [{path: digest}, ...]."""
+        with open(os.path.join(self.root, "snapshots", name + ".json")) as f:
+            return json.load(f)
+
+    def iter_stages(self, name):
+        """Yield a snapshot's stages as lazy (path, bytes) iterators."""
+        for tree in self.load_snapshot(name):
+            yield ((rel, self.get(d)) for rel, d in sorted(tree.items()))
@@ -0,0 +1,285 @@
+"""
+Command line entry point for code_gen generators.
+
+    python -m code_gen.cli write pinion_os out/pinion-os --jobs 8
+"""
+
+import argparse, os, sys, tempfile
+
+from code_gen import batch, bench, import_graph, memo
+from code_gen.blobstore import BlobStore
+from code_gen.export import FORMATS, export
+from code_gen.generators import load
+from code_gen.hooks import TimingReporter
+from code_gen.materialize import Manifest, resolve, write_stages
+from code_gen.pack import build
+from code_gen.stage_diff import diff_stages, drift, summary
+from code_gen.stage_index import StageIndex
+from code_gen.validate import Validator, first_seen
+from code_gen.variants import parse_variant, write_variants
+from code_gen.watch import watch
+
+
+class UsageError(Exception):
+    """Bad arguments only detectable once the generator is loaded."""
+
+
+def check_stage(args, n):
+    """args.stage as an index into n stages; negative counts from the end."""
+    if args.stage is None:
+        return None
+    if not -n <= args.stage < n:
+        raise UsageError("--stage %d out of range: %s has stages 0..%d" % (
+            args.stage, args.generator, n - 1))
+    return args.stage % n
+
+
+def cmd_write(args):
+    written = memo.write(
+        args.generator, args.out, upto=args.stage,
+        jobs=args.jobs, sync=args.sync, use_cache=not args.no_cache,
+    )
+    if written is None:
+        print("%s: up to date (cached)" % args.out)
+    else:
+        print("%s: %d file(s) written" % (args.out, len(written)))
+
+
+def cmd_fast_import(args):
+    hit = memo.history(args.generator, args.out, args.branch, use_cache=not args.no_cache)
+    print("%s: history on %s %s" % (args.out, args.branch, "replayed from cache" if hit else "rebuilt"))
+
+
+def cmd_snapshot(args):
+    store = BlobStore(args.store)
+    trees = store.save_snapshot(args.name, load(args.generator).stages())
+    print("%s: %d stage(s), %d blob(s) stored, %d deduplicated" % (
+        args.name, len(trees), store.stored, store.deduped))
+
+
+def cmd_pack(args):
+    print(build(load(args.generator), args.out))
+
+
+def cmd_diff(args):
+    gen = load(args.generator, args.packed)
+    index = StageIndex(gen.stages())
+    if args.against:
+        problems = drift(index, BlobStore(args.store).load_snapshot(args.against), args.stage)
+        for k, path, why in problems:
+            print("stage %d: %s %s" % (k, path, why))
+        return 1 if problems else 0
+    for change in diff_stages(index):
+        title = gen.titles[change.stage] if gen.titles else ""
+        print("%2d %-36s %s" % (change.stage, title[:36], summary(change)))
+
+
+def cmd_export(args):
+    gen = load(args.generator, args.packed)
+    tree = resolve(gen.stages(), check_stage(args, len(gen.stages())))
+    prefix = args.prefix + "/" if args.prefix else ""
+    if args.output in (None, "-"):
+        export(sys.stdout.buffer, tree, args.format, gen.assets, prefix)
+        sys.stdout.buffer.flush()
+        return
+    with open(args.output, "wb") as f:
+        export(f, tree, args.format, gen.assets, prefix)
+
+
+def cmd_watch(args):
+    try:
+        watch(args.generator, args.out, args.stage, args.interval, args.jobs)
+    except KeyboardInterrupt:
+        pass
+
+
+def cmd_profile(args):
+    gen = load(args.generator)
+    reporter = TimingReporter()
+    with tempfile.TemporaryDirectory() as tmp:
+        out = args.out or os.path.join(tmp, "repo")
+        # a throwaway target keeps its manifest out of the shared cache
+        manifest = None if args.out else Manifest(out, os.path.join(tmp, "manifest.json"))
+        write_stages(
+            out, gen.iter_stages(), jobs=args.jobs, assets=gen.assets,
+            hooks=reporter, titles=gen.titles, manifest=manifest,
+        )
+    reporter.report()
+
+
+def cmd_validate(args):
+    gen = load(args.generator, args.packed)
+    index = StageIndex(gen.stages())
+    stage = check_stage(args, len(index))
+    validator = Validator(jobs=args.jobs)
+    if stage is None:
+        problems = first_seen(validator.check_index(index))
+    else:
+        problems = validator.check_tree(index.tree_at(stage), stage)
+    validator.save()
+    for p in problems:
+        print("stage %s: %s: %s" % (p.stage, p.path, p.message))
+    return 1 if problems else 0
+
+
+def cmd_graph(args):
+    gen = load(args.generator, args.packed)
+    stages = gen.stages()
+    graph, check_sets = import_graph.build(stages, check_stage(args, len(stages)))
+    if args.affected:
+        for path in sorted(graph.affected(args.affected)):
+            print(path)
+    elif args.check:
+        for path in check_sets[-1]:
+            print(path)
+    else:
+        for importer in sorted(graph.deps):
+            for target in sorted(graph.deps[importer]):
+                print("%s -> %s" % (importer, target))
+    return 0
+
+
+def cmd_batch(args):
+    results = batch.batch(
+        args.out_root, args.only, args.jobs, args.mode, use_cache=not args.no_cache,
+    )
+    return 1 if batch.failures(results) else 0
+
+
+def cmd_variants(args):
+    gen = load(args.generator, args.packed)
+    if not gen.slots:
+        print("%s: generator declares no SLOTS" % args.generator, file=sys.stderr)
+        return 1
+    if args.list:
+        for s in gen.slots:
+            print("%-10s %s" % (s.name, s.default))
+        return 0
+    if not args.variant:
+        print("no --variant given", file=sys.stderr)
+        return 1
+    try:
+        written = write_variants(
+            gen, args.out_root, args.variant, check_stage(args, len(gen.stages())), args.jobs,
+        )
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    for name, paths in written.items():
+        print("%s: %d file(s) written" % (os.path.join(args.out_root, name), len(paths)))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="code_gen")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("write", help="materialize the resolved tree into a dir")
+    p.add_argument("generator", help="module name under code_gen, e.g. pinion_os")
+    p.add_argument("out", help="output repo directory")
+    p.add_argument("--stage", type=int, default=None, help="stop after stage K")
+    p.add_argument("--jobs", "-j", type=int, default=1, help="writer threads")
+    p.add_argument("--sync", action="store_true", help="fsync written files and their directories")
+    p.add_argument("--no-cache", action="store_true", help="ignore memoized output and packs")
+    p.set_defaults(func=cmd_write)
+
+    p = sub.add_parser("fast-import", help="build the stage history via git fast-import")
+    p.add_argument("generator", help="module name under code_gen, e.g. pinion_os")
+    p.add_argument("out", help="output git repo (created if missing)")
+    p.add_argument("--branch", default="main")
+    p.add_argument("--no-cache", action="store_true", help="ignore memoized output and packs")
+    p.set_defaults(func=cmd_fast_import)
+
+    p = sub.add_parser("snapshot", help="intern all stages into the blob store")
+    p.add_argument("generator", help="module name under code_gen, e.g. pinion_os")
+    p.add_argument("name", help="snapshot name, e.g. a version")
+    p.add_argument("--store", default=None, help="blob store root (default: cache)")
+    p.set_defaults(func=cmd_snapshot)
+
+    p = sub.add_parser("pack", help="precompile a generator's stages into a pack")
+    p.add_argument("generator", help="module name under code_gen, e.g. pinion_os")
+    p.add_argument("--out", default=None, help="pack path (default: cache)")
+    p.set_defaults(func=cmd_pack)
+
+    p = sub.add_parser("diff", help="per-stage change stats, or drift vs a snapshot")
+    p.add_argument("generator", help="module name under code_gen, e.g. pinion_os")
+    p.add_argument("--against", help="snapshot name to check for drift")
+    p.add_argument("--stage", type=int, default=None, help="only check stages <= K")
+    p.add_argument("--store", default=None, help="blob store root (default: cache)")
+    p.add_argument("--packed", action="store_true", help="read stages from the stage pack")
+    p.set_defaults(func=cmd_diff)
+
+    p = sub.add_parser("export", help="stream a stage snapshot as tar.gz/tar/zip")
+    p.add_argument("generator", help="module name under code_gen, e.g. pinion_os")
+    p.add_argument("--stage", type=int, default=None, help="snapshot after stage K")
+    p.add_argument("--format", choices=FORMATS, default="tar.gz")
+    p.add_argument("--prefix", default="", help="top-level directory inside the archive")
+    p.add_argument("--output", "-o", default=None, help="file to write (default: stdout)")
+    p.add_argument("--packed", action="store_true", help="read stages from the stage pack")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("watch", help="keep a dir in sync while editing the generator")
+    p.add_argument("generator", help="module name under code_gen, e.g. pinion_os")
+    p.add_argument("out", help="output repo directory")
+    p.add_argument("--stage", type=int, default=None, help="stop after stage K")
+    p.add_argument("--interval", type=float, default=0.2, help="poll interval in seconds")
+    p.add_argument("--jobs", "-j", type=int, default=1, help="writer threads")
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser("profile", help="write stage by stage and print a cost table")
+    p.add_argument("generator", help="module name under code_gen, e.g. pinion_os")
+    p.add_argument("out", nargs="?", default=None, help="output dir (default: temp dir)")
+    p.add_argument("--jobs", "-j", type=int, default=1, help="writer threads")
+    p.set_defaults(func=cmd_profile)
+
+    p = sub.add_parser("validate", help="check JSON files and relative TS imports per stage")
+    p.add_argument("generator", help="module name under code_gen, e.g. pinion_os")
+    p.add_argument("--stage", type=int, default=None, help="only check the tree after stage K")
+    p.add_argument("--jobs", "-j", type=int, default=1, help="analysis processes")
+    p.add_argument("--packed", action="store_true", help="read stages from the stage pack")
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser("graph", help="relative import graph of the generated TypeScript")
+    p.add_argument("generator", help="module name under code_gen, e.g. pinion_os")
+    p.add_argument("--stage", type=int, default=None, help="graph after stage K")
+    p.add_argument("--affected", nargs="+", metavar="PATH", help="print files that depend on PATH")
+    p.add_argument("--check", action="store_true", help="print the files to type-check for the stage")
+    p.add_argument("--packed", action="store_true", help="read stages from the stage pack")
+    p.set_defaults(func=cmd_graph)
+
+    p = sub.add_parser("batch", help="generate every discovered repo in a process pool")
+    p.add_argument("out_root", help="directory that receives one repo per generator")
+    p.add_argument("--only", nargs="+", default=None, help="generator names (default: all)")
+    p.add_argument("--jobs", "-j", type=int, default=None, help="worker processes (default: CPUs)")
+    p.add_argument("--mode", choices=("write", "fast-import"), default="write")
+    p.add_argument("--no-cache", action="store_true", help="ignore memoized output and packs")
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser("variants", help="render several flavors of a generator in one pass")
+    p.add_argument("generator", help="module name under code_gen, e.g. pinion_os")
+    p.add_argument("out_root", nargs="?", default=".", help="directory that receives one repo per variant")
+    p.add_argument("--variant", "-V", action="append", type=parse_variant, default=[],
+                   help="NAME[:slot=value,...], repeatable")
+    p.add_argument("--list", action="store_true", help="print the generator's slots and defaults")
+    p.add_argument("--stage", type=int, default=None, help="stop after stage K")
+    p.add_argument("--jobs", "-j", type=int, default=1, help="writer threads")
+    p.add_argument("--packed", action="store_true", help="read stages from the stage pack")
+    p.set_defaults(func=cmd_variants)
+
+    p = sub.add_parser("bench", help="time and measure a generator")
+    bench.add_arguments(p)
+    p.set_defaults(func=bench.cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except UsageError as e:
+        parser.error("%s: %s" % (args.command, e))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
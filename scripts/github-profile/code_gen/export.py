@@ -0,0 +1,67 @@
+"""
+Streaming archive export of a resolved stage tree.
+Writes tar(.gz) or zip straight to a file object (stdout included), with
+no working directory in between. Entries are sorted with fixed mtimes so
+the same tree always produces the same archive.
+"""
+
+import gzip, io, tarfile, time, zipfile
+
+from code_gen.materialize import to_bytes
+
+
+FORMATS = ("tar.gz", "tar", "zip")
+
+# 1980-01-01, the earliest time zip can store
+EPOCH = 315532800
+
+
+def _entries(tree, assets, prefix):
+    """Yield (arcname, bytes or None, src path or None) in stable order."""
+    for rel in sorted(tree):
+        yield prefix + rel, to_bytes(tree[rel]), None
+    for rel, src in sorted((assets or {}).items()):
+        yield prefix + rel, None, src
+
+
+def write_tar(out, tree, assets=None, prefix="", compress=True, mtime=EPOCH):
+    if compress:
+        # gzip ourselves: tarfile's "w|gz" stamps the header with time.time()
+        with gzip.GzipFile(filename="", fileobj=out, mode="wb", mtime=mtime) as gz:
+            return write_tar(gz, tree, assets, prefix, False, mtime)
+    with tarfile.open(fileobj=out, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+        for name, data, src in _entries(tree, assets, prefix):
+            if src is not None:
+                info = tar.gettarinfo(src, arcname=name)
+                info.mtime, info.uid, info.gid, info.uname, info.gname = mtime, 0, 0, "", ""
+                with open(src, "rb") as f:
+                    tar.addfile(info, f)
+                continue
+            info = tarfile.TarInfo(name)
+            info.size, info.mode, info.mtime = len(data), 0o644, mtime
+            tar.addfile(info, io.BytesIO(data))
+
+
+def write_zip(out, tree, assets=None, prefix="", mtime=EPOCH):
+    stamp = time.gmtime(mtime)[:6]
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data, src in _entries(tree, assets, prefix):
+            info = zipfile.ZipInfo(name, date_time=stamp)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            if src is None:
+                zf.writestr(info, data)
+                continue
+            with open(src, "rb") as f, zf.open(info, "w") as dst:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    dst.write(chunk)
+
+
+def export(out, tree, fmt="tar.gz", assets=None, prefix=""):
+    """Write tree (plus assets) to out as fmt, one of FORMATS."""
+    if fmt == "zip":
+        write_zip(out, tree, assets, prefix)
+    elif fmt in ("tar.gz", "tar"):
+        write_tar(out, tree, assets, prefix, compress=fmt == "tar.gz")
+    else:
+        raise ValueError("unknown archive format %r (expected one of %s)" % (fmt, ", ".join(FORMATS)))
@@ -0,0 +1,86 @@
+"""
+Lookup of code_gen generator modules.
+A generator is a module code_gen.<name> exposing a module-level STAGES
+table and <name>_stages() and, optionally, iter_<name>_stages(), ASSETS,
+STAGE_TITLES and SLOTS.
+"""
+
+import functools, importlib, os, re, sys
+from collections import namedtuple
+
+from code_gen.materialize import FrozenStages
+from code_gen.pack import SHARED_SOURCES, build, module_dir, open_pack
+from code_gen.variants import Slot
+
+
+# stages() is the whole, built-once stage list; iter_stages() produces the
+# stages lazily, one at a time, for the streaming writers
+Generator = namedtuple("Generator", "name module stages iter_stages assets titles slots")
+
+
+def discover():
+    """Names of every generator module in the code_gen package.
+
+    A module <name>.py qualifies when it assigns a module-level STAGES and
+    defines <name>_stages(); the STAGES table is the explicit marker, so a
+    helper that merely matches the naming is not picked up. Sources are
+    scanned, not imported, so one broken generator can't hide the rest.
+    """
+    import code_gen
+
+    names = set()
+    for root in code_gen.__path__:
+        for fname in os.listdir(root):
+            name, ext = os.path.splitext(fname)
+            if ext != ".py" or name.startswith("_"):
+                continue
+            try:
+                with open(os.path.join(root, fname), encoding="utf-8") as f:
+                    src = f.read()
+            except OSError:
+                continue
+            if (re.search(r"^STAGES\s*=", src, re.M)
+                    and re.search(r"^def %s_stages\(" % re.escape(name), src, re.M)):
+                names.add(name)
+    return sorted(names)
+
+
+def load(name, packed=False):
+    """Return the Generator for code_gen.<name>.
+
+    With packed=True stages come from a current stage pack without
+    importing the module; a missing or stale pack is rebuilt from it.
+    """
+    if packed:
+        pack = open_pack(name)
+        if pack is not None:
+            index = pack.index
+            frozen = functools.lru_cache(maxsize=None)(lambda: FrozenStages(pack.stages()))
+            return Generator(
+                name, None, frozen, pack.stages,
+                pack.assets(module_dir(name)), index["titles"] or None,
+                tuple(Slot(*s) for s in index.get("slots", ())),
+            )
+    mod = importlib.import_module("code_gen." + name)
+    stages = getattr(mod, name + "_stages")
+    gen = Generator(
+        name, mod, stages, getattr(mod, "iter_%s_stages" % name, None) or stages,
+        getattr(mod, "ASSETS", {}), getattr(mod, "STAGE_TITLES", None),
+        tuple(getattr(mod, "SLOTS", ())),
+    )
+    if packed:
+        try:
+            build(gen)
+        except OSError:
+            pass
+    return gen
+
+
+def reload(name):
+    """Re-import code_gen.<name>, its <name>_* helpers and shared sources."""
+    prefix = "code_gen.%s_" % name
+    helpers = sorted(m for m in sys.modules if m.startswith(prefix))
+    for mod in SHARED_SOURCES + tuple(helpers) + ("code_gen." + name,):
+        if mod in sys.modules:
+            importlib.reload(sys.modules[mod])
+    return load(name)
@@ -0,0 +1,59 @@
+"""
+Profiling hooks for stage production and materialization.
+Pass a Hooks instance to write_stages(); TimingReporter is the built-in
+one and prints stages sorted by cost.
+"""
+
+import sys, threading
+
+
+class Hooks:
+    """No-op base. on_file_written may be called from writer threads."""
+
+    def on_stage_start(self, stage, title):
+        pass
+
+    def on_file_written(self, stage, path, nbytes, seconds):
+        pass
+
+    def on_stage_end(self, stage, files, nbytes, produce_s, write_s):
+        pass
+
+
+class TimingReporter(Hooks):
+    """Collects per-stage and per-file timings; report() prints a table."""
+
+    def __init__(self):
+        self.rows = {}
+        self.files = []
+        self._lock = threading.Lock()
+
+    def on_stage_start(self, stage, title):
+        self.rows[stage] = {"stage": stage, "title": title or ""}
+
+    def on_file_written(self, stage, path, nbytes, seconds):
+        with self._lock:
+            self.files.append((stage, path, nbytes, seconds))
+
+    def on_stage_end(self, stage, files, nbytes, produce_s, write_s):
+        self.rows[stage].update(
+            files=files, bytes=nbytes, produce_s=produce_s, write_s=write_s,
+        )
+
+    def stages(self):
+        """Finished stage rows, most expensive first."""
+        rows = [r for r in self.rows.values() if "write_s" in r]
+        return sorted(rows, key=lambda r: r["produce_s"] + r["write_s"], reverse=True)
+
+    def report(self, out=sys.stdout, top_files=5):
+        out.write("%-6s %-36s %5s %9s %10s %10s\n" % (
+            "stage", "title", "files", "bytes", "produce_ms", "write_ms"))
+        for r in self.stages():
+            out.write("%-6d %-36s %5d %9d %10.3f %10.3f\n" % (
+                r["stage"], r["title"][:36], r["files"], r["bytes"],
+                r["produce_s"] * 1e3, r["write_s"] * 1e3))
+        slowest = sorted(self.files, key=lambda f: f[3], reverse=True)[:top_files]
+        if slowest:
+            out.write("slowest files:\n")
+            for stage, path, nbytes, seconds in slowest:
+                out.write("  %8.3f ms %9d B  [%d] %s\n" % (seconds * 1e3, nbytes, stage, path))
@@ -0,0 +1,112 @@
+"""
+Import graph of the generated TypeScript, built stage by stage.
+Each update relinks only the files a stage touched (plus importers
+whose missing targets just appeared), so the graph after stage K
+answers "what depends on P" and "what must be type-checked for K"
+without rescanning the tree.
+"""
+
+from collections import deque
+
+from code_gen.materialize import iter_files
+from code_gen.validate import TS_EXTS, analyse, candidates
+
+
+class ImportGraph:
+    """importer -> resolved relative imports, with the reverse edges."""
+
+    def __init__(self):
+        self.deps = {}
+        self.rdeps = {}
+        self.specs = {}
+        self._content = {}
+        self._missing = {}   # candidate path -> importers waiting for it
+        self._waiting = {}   # importer -> candidate paths it waits for
+
+    def __contains__(self, path):
+        return path in self._content
+
+    def _unlink(self, importer):
+        for target in self.deps.pop(importer, ()):
+            self.rdeps[target].discard(importer)
+        for c in self._waiting.pop(importer, ()):
+            # popped already if c has since been written
+            self._missing.get(c, set()).discard(importer)
+
+    def _link(self, importer):
+        self._unlink(importer)
+        deps = set()
+        for spec in self.specs[importer]:
+            cands = candidates(importer, spec)
+            hit = next((c for c in cands if c in self._content), None)
+            if hit is not None:
+                deps.add(hit)
+                continue
+            for c in cands:
+                self._missing.setdefault(c, set()).add(importer)
+            self._waiting.setdefault(importer, set()).update(cands)
+        self.deps[importer] = deps
+        for target in deps:
+            self.rdeps.setdefault(target, set()).add(importer)
+
+    def update(self, files):
+        """Apply one stage's files; returns the paths whose content changed."""
+        changed, relink = set(), set()
+        for path, content in iter_files(files):
+            old = self._content.get(path)
+            if old == content:
+                continue
+            self._content[path] = content
+            changed.add(path)
+            if old is None:
+                relink.update(self._missing.pop(path, ()))
+            if path.endswith(TS_EXTS):
+                imports = analyse(path, content)["imports"]
+                if imports != self.specs.get(path):
+                    self.specs[path] = imports
+                    relink.add(path)
+        for importer in relink:
+            self._link(importer)
+        return changed
+
+    def _walk(self, paths, edges):
+        seen = set(paths)
+        todo = deque(seen)
+        while todo:
+            for nxt in edges.get(todo.popleft(), ()):
+                if nxt not in seen:
+                    seen.add(nxt)
+                    todo.append(nxt)
+        return seen
+
+    def affected(self, paths):
+        """paths plus every file that imports one of them, transitively."""
+        return self._walk(paths, self.rdeps)
+
+    def dependencies(self, paths):
+        """paths plus everything they import, transitively."""
+        return self._walk(paths, self.deps)
+
+    def check_set(self, changed):
+        """Sorted TypeScript files that need type-checking after changed."""
+        return sorted(p for p in self.affected(changed) if p.endswith(TS_EXTS))
+
+    def unresolved(self):
+        """{importer: [specifier, ...]} for imports with no target yet."""
+        out = {}
+        for importer in sorted(self._waiting):
+            specs = [s for s in self.specs[importer]
+                     if not any(c in self._content for c in candidates(importer, s))]
+            if specs:
+                out[importer] = specs
+        return out
+
+
+def build(stages, upto=None):
+    """Graph after stages[0..upto], plus the per-stage check sets."""
+    graph, check_sets = ImportGraph(), []
+    for k, files in enumerate(stages):
+        if upto is not None and k > upto:
+            break
+        check_sets.append(graph.check_set(graph.update(files)))
+    return graph, check_sets
@@ -0,0 +1,392 @@
+"""
+Stage materializer for code_gen repos.
+Keeps a persisted path -> sha256 manifest per output repo so a rerun
+only writes the files whose content actually changed.
+"""
+
+import hashlib, json, os, shutil, time
+from types import MappingProxyType
+
+from code_gen.hooks import Hooks
+
+try:
+    import fcntl
+except ImportError:  # not on Windows
+    fcntl = None
+
+
+MANIFEST_VERSION = 1
+
+# linux ioctl to share extents between files (btrfs, xfs, overlayfs ...)
+FICLONE = 0x40049409
+
+_file_digests = {}
+
+
+def cache_dir(*parts):
+    """Return (and create) a directory under the code_gen cache root."""
+    root = os.environ.get("CODE_GEN_CACHE") or os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+        "code_gen",
+    )
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def to_bytes(content):
+    return content.encode("utf-8") if isinstance(content, str) else content
+
+
+def sha256_hex(content):
+    return hashlib.sha256(to_bytes(content)).hexdigest()
+
+
+def file_digest(path):
+    """sha256 of a file on disk, cached per (path, size, mtime)."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    digest = _file_digests.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = _file_digests[key] = h.hexdigest()
+    return digest
+
+
+def iter_files(files):
+    """Yield (path, content) from a dict or an iterable of pairs."""
+    return iter(files.items()) if hasattr(files, "items") else iter(files)
+
+
+class FrozenStages(tuple):
+    """Stages as read-only {path: content} views; copy() returns plain dicts."""
+
+    __slots__ = ()
+
+    def __new__(cls, stages):
+        return tuple.__new__(cls, (MappingProxyType(dict(iter_files(f))) for f in stages))
+
+    def copy(self):
+        return [dict(files) for files in self]
+
+
+class Manifest:
+    """Path -> {sha256, size, mtime_ns} record of what was last written."""
+
+    def __init__(self, repo_dir, path=None):
+        self.repo_dir = os.path.abspath(repo_dir)
+        self.path = path or os.path.join(
+            cache_dir("manifests"), sha256_hex(self.repo_dir)[:16] + ".json",
+        )
+        self.entries = {}
+        self.dirty = False
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == MANIFEST_VERSION and data.get("repo") == self.repo_dir:
+            self.entries = data.get("files", {})
+
+    def is_current(self, rel, digest):
+        """True if rel on disk is still exactly what we wrote with this digest."""
+        entry = self.entries.get(rel)
+        if entry is None or entry["sha256"] != digest:
+            return False
+        try:
+            st = os.stat(os.path.join(self.repo_dir, rel))
+        except OSError:
+            return False
+        return st.st_size == entry["size"] and st.st_mtime_ns == entry["mtime_ns"]
+
+    def forget(self, rel):
+        if self.entries.pop(rel, None) is not None:
+            self.dirty = True
+
+    def record(self, rel, digest):
+        st = os.stat(os.path.join(self.repo_dir, rel))
+        self.entries[rel] = {
+            "sha256": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+        }
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({
+                "version": MANIFEST_VERSION,
+                "repo": self.repo_dir,
+                "files": self.entries,
+            }, f, sort_keys=True)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+def _reflink(src, dst):
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+
+
+def _copy_range(src, dst):
+    """Kernel-side copy: copy_file_range, else sendfile."""
+    copy_range = getattr(os, "copy_file_range", None)
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        size, off = os.fstat(s.fileno()).st_size, 0
+        while off < size:
+            if copy_range is not None:
+                sent = copy_range(s.fileno(), d.fileno(), size - off, off, off)
+            else:
+                sent = os.sendfile(d.fileno(), s.fileno(), off, size - off)
+            if not sent:
+                raise OSError("short copy of %s" % src)
+            off += sent
+
+
+def _link(src, dst):
+    tmp = dst + ".link.tmp"
+    if os.path.lexists(tmp):
+        os.remove(tmp)
+    os.link(src, tmp)
+    os.replace(tmp, dst)
+
+
+PLACERS = {
+    "link": [_link],
+    "auto": ([_reflink] if fcntl is not None else []) + [_copy_range],
+    "copy": [],
+}
+
+
+def same_content(src, dst):
+    try:
+        s, d = os.stat(src), os.stat(dst)
+    except OSError:
+        return False
+    if s.st_size != d.st_size:
+        return False
+    return os.path.samestat(s, d) or file_digest(src) == file_digest(dst)
+
+
+def place_file(src, dst, mode="auto"):
+    """Copy src to dst unless dst already matches; returns the method or None.
+
+    mode "auto" tries a reflink, then copy_file_range/sendfile, so bytes
+    never pass through userspace; "link" hardlinks; "copy" is plain
+    shutil. Anything that fails falls back to shutil.copyfile.
+    """
+    if same_content(src, dst):
+        return None
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    if os.path.lexists(dst):
+        # never write through an existing hardlink
+        os.remove(dst)
+    for placer in PLACERS[mode]:
+        try:
+            placer(src, dst)
+        except (OSError, AttributeError):
+            continue
+        if placer is not _link:
+            shutil.copystat(src, dst)
+        return placer.__name__.lstrip("_")
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def _fsync_path(path):
+    """fsync a file or directory by path; no-op where directories can't be opened."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write(dst, data, sync=False):
+    with open(dst, "wb") as f:
+        f.write(data)
+        if sync:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _place(src, dst, sync=False):
+    method = place_file(src, dst)
+    if sync and method is not None:
+        _fsync_path(dst)
+    return method
+
+
+def _dirs_to_sync(repo_dir, rels):
+    """Parent directories of rels, and their parents up to repo_dir."""
+    top = os.path.abspath(repo_dir)
+    dirs = set()
+    for rel in rels:
+        d = os.path.dirname(os.path.abspath(os.path.join(repo_dir, rel)))
+        while d not in dirs:
+            dirs.add(d)
+            if d == top or len(d) <= len(top):
+                break
+            d = os.path.dirname(d)
+    return sorted(dirs)
+
+
+def _timed(hooks, stage, rel, nbytes, fn):
+    """Wrap fn so each call reports to hooks.on_file_written."""
+    def call(*args):
+        t0 = time.perf_counter()
+        fn(*args)
+        hooks.on_file_written(stage, rel, nbytes, time.perf_counter() - t0)
+    return call
+
+
+def _run(jobs, fn, args):
+    if jobs > 1 and len(args) > 1:
+        # imported here: concurrent.futures pulls in logging, which is
+        # most of a cold start for single-threaded runs
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            list(pool.map(lambda a: fn(*a), args))
+    else:
+        for a in args:
+            fn(*a)
+
+
+def prune(repo_dir, keep, manifest):
+    """Remove files the manifest tracks that are not in keep; returns them.
+
+    A file edited since it was written is left on disk and only
+    forgotten. Directories emptied by the removal go too.
+    """
+    removed = []
+    top = os.path.abspath(repo_dir)
+    for rel in sorted(set(manifest.entries) - set(keep)):
+        path = os.path.join(top, rel)
+        if manifest.is_current(rel, manifest.entries[rel]["sha256"]):
+            os.remove(path)
+            removed.append(rel)
+            d = os.path.dirname(path)
+            while d != top and d.startswith(top + os.sep):
+                try:
+                    os.rmdir(d)
+                except OSError:
+                    break
+                d = os.path.dirname(d)
+        manifest.forget(rel)
+    return removed
+
+
+def write_files(repo_dir, files, manifest=None, jobs=1, sync=False, assets=None,
+                hooks=None, stage=None, prune_stale=False):
+    """Write files under repo_dir, skipping unchanged ones. Returns written paths.
+
+    Directories are created up front, then files (and any {rel: src_path}
+    assets) are written on a pool of `jobs` threads. With sync=True each
+    written file is fsynced by its worker, then every touched directory
+    once. hooks gets on_file_written for each file actually written.
+    With prune_stale=True files is the whole tree, and previously written
+    paths missing from it (and from assets) are removed.
+    """
+    own = manifest is None
+    if own:
+        manifest = Manifest(repo_dir)
+    pending, seen = [], set()
+    for rel, content in iter_files(files):
+        seen.add(rel)
+        data = to_bytes(content)
+        digest = sha256_hex(data)
+        if not manifest.is_current(rel, digest):
+            pending.append((rel, data, digest))
+    copies = []
+    for rel, src in sorted((assets or {}).items()):
+        digest = file_digest(src)
+        if not manifest.is_current(rel, digest):
+            copies.append((rel, src, digest))
+
+    rels = [rel for rel, _, _ in pending] + [rel for rel, _, _ in copies]
+    for d in sorted({os.path.dirname(os.path.join(repo_dir, r)) for r in rels}):
+        os.makedirs(d, exist_ok=True)
+    if hooks is None:
+        _run(jobs, _write, [(os.path.join(repo_dir, rel), data, sync) for rel, data, _ in pending])
+        _run(jobs, _place, [(src, os.path.join(repo_dir, rel), sync) for rel, src, _ in copies])
+    else:
+        _run(jobs, lambda fn, *a: fn(*a), [
+            (_timed(hooks, stage, rel, len(data), _write), os.path.join(repo_dir, rel), data, sync)
+            for rel, data, _ in pending
+        ] + [
+            (_timed(hooks, stage, rel, os.path.getsize(src), _place),
+             src, os.path.join(repo_dir, rel), sync)
+            for rel, src, _ in copies
+        ])
+    if sync:
+        # new directory entries are only durable once their parent is synced
+        for d in _dirs_to_sync(repo_dir, rels):
+            _fsync_path(d)
+
+    for rel, _, digest in pending + copies:
+        manifest.record(rel, digest)
+    if prune_stale:
+        prune(repo_dir, seen | set(assets or ()), manifest)
+    if own:
+        manifest.save()
+    return rels
+
+
+def write_stages(repo_dir, stages, jobs=1, sync=False, assets=None, on_stage=None,
+                 hooks=None, titles=None, manifest=None):
+    """Write stages one after another, calling on_stage(k, written) after each.
+
+    Assets are placed with the first stage. With sync=True each stage's
+    files are durable before on_stage runs. on_stage is where a caller
+    commits the stage; the manifest is saved after every stage so an
+    interrupted run resumes cleanly. hooks (see code_gen.hooks) sees the
+    start and end of every stage with byte counts and timings.
+    """
+    hooks = hooks or Hooks()
+    manifest = manifest or Manifest(repo_dir)
+    for k, files in enumerate(stages):
+        stage_assets = assets if k == 0 else None
+        hooks.on_stage_start(k, titles[k] if titles and k < len(titles) else None)
+        t0 = time.perf_counter()
+        files = list(iter_files(files))
+        t1 = time.perf_counter()
+        written = write_files(
+            repo_dir, files, manifest, jobs=jobs, sync=sync,
+            assets=stage_assets, hooks=hooks, stage=k,
+        )
+        manifest.save()
+        nbytes = sum(len(to_bytes(c)) for _, c in files)
+        nbytes += sum(os.path.getsize(src) for src in (stage_assets or {}).values())
+        hooks.on_stage_end(
+            k, len(files) + len(stage_assets or {}), nbytes, t1 - t0, time.perf_counter() - t1,
+        )
+        if on_stage is not None:
+            on_stage(k, written)
+    return manifest
+
+
+def resolve(stages, upto=None):
+    """Fold stages[0..upto] into the resulting {path: content} tree."""
+    tree = {}
+    for i, files in enumerate(stages):
+        if upto is not None and i > upto:
+            break
+        tree.update(iter_files(files))
+    return tree
+
+
+def materialize(repo_dir, stages, upto=None, jobs=1, sync=False, assets=None):
+    """Bring repo_dir in line with the resolved tree; returns written paths."""
+    return write_files(
+        repo_dir, resolve(stages, upto), jobs=jobs, sync=sync, assets=assets,
+        prune_stale=True,
+    )
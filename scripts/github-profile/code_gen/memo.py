@@ -0,0 +1,121 @@
+"""
+Whole-output memoization.
+Fingerprints a generator's inputs (its module, code_gen.base and its
+assets) and, when nothing changed, reuses the previously materialized
+tree or fast-import stream without evaluating a single stage.
+"""
+
+import json, os, time
+
+from code_gen.fast_import import default_author, import_stream, write_stream
+from code_gen.generators import load
+from code_gen.materialize import (
+    Manifest, cache_dir, file_digest, resolve, sha256_hex, write_files,
+)
+from code_gen.pack import source_hash
+
+
+MAX_ENTRIES = 64
+MAX_AGE = 30 * 86400
+
+
+def fingerprint(gen):
+    """Hash of everything gen's output depends on."""
+    parts = [source_hash(gen.name)]
+    for rel, src in sorted(gen.assets.items()):
+        parts.append("%s=%s" % (rel, file_digest(src)))
+    return sha256_hex("\n".join(parts))
+
+
+class OutputCache:
+    """Memo records and stream files under the cache dir, evicted LRU/age."""
+
+    def __init__(self, root=None, max_entries=MAX_ENTRIES, max_age=MAX_AGE):
+        self.root = root or cache_dir("memo")
+        self.max_entries = max_entries
+        self.max_age = max_age
+
+    def path(self, *parts, ext=".json"):
+        return os.path.join(self.root, sha256_hex("\0".join(map(str, parts))) + ext)
+
+    def lookup(self, path):
+        """Return path if cached (marking it recently used), else None."""
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def store(self, path, write):
+        """Run write(f) into a temp file and publish it at path."""
+        tmp = "%s.%d.tmp" % (path, os.getpid())
+        with open(tmp, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+        self.evict()
+        return path
+
+    def evict(self):
+        """Drop entries older than max_age, then all but the newest max_entries."""
+        entries = []
+        for name in os.listdir(self.root):
+            if name.endswith(".tmp"):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                entries.append((os.stat(path).st_mtime, path))
+            except OSError:
+                pass
+        entries.sort(reverse=True)
+        now = time.time()
+        for i, (mtime, path) in enumerate(entries):
+            if i >= self.max_entries or now - mtime > self.max_age:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+def write(name, out, upto=None, jobs=1, sync=False, use_cache=True, cache=None):
+    """Materialize generator name into out; returns written paths, or None on a hit.
+
+    A hit needs the same fingerprint, target and stage, and every file
+    in out still matching the manifest by stat. use_cache=False skips
+    both this and the stage pack.
+    """
+    gen = load(name, packed=use_cache)
+    cache = cache or OutputCache()
+    record = cache.path("write", fingerprint(gen), os.path.abspath(out), upto)
+    if use_cache and cache.lookup(record):
+        with open(record) as f:
+            files = json.load(f)
+        manifest = Manifest(out)
+        if all(manifest.is_current(rel, d) for rel, d in files.items()):
+            return None
+
+    tree = resolve(gen.stages(), upto)
+    written = write_files(
+        out, tree, jobs=jobs, sync=sync, assets=gen.assets, prune_stale=True,
+    )
+    files = {rel: sha256_hex(c) for rel, c in tree.items()}
+    files.update((rel, file_digest(src)) for rel, src in gen.assets.items())
+    cache.store(record, lambda f: f.write(json.dumps(files, sort_keys=True).encode()))
+    return written
+
+
+def history(name, repo_dir, branch="main", use_cache=True, cache=None):
+    """Build the stage history via fast-import; returns True on a cache hit.
+
+    The stream is saved on a miss and replayed as-is on a hit, so the
+    generated commits (timestamps included) are identical between runs.
+    """
+    gen = load(name, packed=use_cache)
+    cache = cache or OutputCache()
+    stream = cache.path("stream", fingerprint(gen), branch, default_author(), ext=".fi")
+    hit = use_cache and cache.lookup(stream) is not None
+    if not hit:
+        cache.store(stream, lambda f: write_stream(
+            f, gen.iter_stages(), gen.titles, gen.assets, branch,
+        ))
+    import_stream(repo_dir, stream, branch)
+    return hit
@@ -0,0 +1,137 @@
+"""
+Precompiled stage packs.
+A pack holds every stage of a generator as marshal records plus an
+offset index, keyed by a hash of the generator sources. Loading one
+memory-maps the file and never imports the generator module.
+
+    python -m code_gen.cli pack pinion_os
+
+Layout: MAGIC, stage records..., marshal(index), u64 index offset.
+Asset paths are stored relative to the generator module, so a pack in
+a shared cache stays valid for every checkout of the same sources.
+"""
+
+import glob, hashlib, importlib.util, marshal, mmap, os, struct, sys
+
+from code_gen.materialize import cache_dir, iter_files
+
+
+MAGIC = b"CGPACK2\n"
+TRAILER = struct.Struct("<Q")
+
+# modules whose source feeds every generator
+SHARED_SOURCES = ("code_gen.base", "code_gen.variants")
+
+
+def source_files(name):
+    """Source paths of code_gen.<name>, its <name>_*.py helpers and shared inputs.
+
+    Found without importing anything.
+    """
+    paths = []
+    for mod in ("code_gen." + name,) + SHARED_SOURCES:
+        spec = importlib.util.find_spec(mod)
+        if spec is not None and spec.origin and os.path.exists(spec.origin):
+            paths.append(spec.origin)
+            if mod == "code_gen." + name:
+                paths += sorted(glob.glob(os.path.join(
+                    os.path.dirname(spec.origin), glob.escape(name) + "_*.py",
+                )))
+    return paths
+
+
+def module_dir(name):
+    """Directory holding code_gen.<name>'s source, found without importing it."""
+    spec = importlib.util.find_spec("code_gen." + name)
+    return os.path.dirname(spec.origin)
+
+
+def source_hash(name):
+    """Hash of the generator sources and the marshal format in use."""
+    h = hashlib.sha256(b"%d.%d" % sys.version_info[:2])
+    for path in source_files(name):
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def pack_path(name):
+    return os.path.join(cache_dir("packs"), name + ".pack")
+
+
+def build(gen, path=None):
+    """Write gen's stages to a pack; returns the pack path."""
+    path = path or pack_path(gen.name)
+    base = module_dir(gen.name)
+    index = {
+        "name": gen.name,
+        "source": source_hash(gen.name),
+        "assets": {rel: os.path.relpath(src, base) for rel, src in gen.assets.items()},
+        "titles": tuple(gen.titles or ()),
+        # marshal only takes plain tuples, not namedtuples
+        "slots": tuple(tuple(s) for s in gen.slots),
+        "stages": [],
+    }
+    tmp = "%s.%d.tmp" % (path, os.getpid())
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        for files in gen.iter_stages():
+            record = marshal.dumps(tuple(iter_files(files)))
+            index["stages"].append((f.tell(), len(record)))
+            f.write(record)
+        offset = f.tell()
+        f.write(marshal.dumps(index))
+        f.write(TRAILER.pack(offset))
+    os.replace(tmp, path)
+    return path
+
+
+class Pack:
+    """Memory-mapped, read-only view of a stage pack."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError("not a code_gen pack: %s" % path)
+        (offset,) = TRAILER.unpack(self._map[-TRAILER.size:])
+        self.index = marshal.loads(self._map[offset:-TRAILER.size])
+
+    def __len__(self):
+        return len(self.index["stages"])
+
+    def assets(self, base):
+        """{rel: src_path} with the stored asset paths resolved against base."""
+        return {
+            rel: os.path.normpath(os.path.join(base, src))
+            for rel, src in self.index["assets"].items()
+        }
+
+    def stage(self, k):
+        """Stage k as a tuple of (path, content) pairs."""
+        off, size = self.index["stages"][k]
+        return marshal.loads(self._map[off:off + size])
+
+    def stages(self):
+        for k in range(len(self)):
+            yield iter(self.stage(k))
+
+    def close(self):
+        self._map.close()
+
+
+def open_pack(name, path=None):
+    """Return the Pack for name if it exists and matches the sources, else None.
+
+    A pack whose assets are missing from this checkout counts as stale.
+    """
+    try:
+        pack = Pack(path or pack_path(name))
+    except (OSError, ValueError, EOFError):
+        return None
+    if pack.index.get("source") != source_hash(name) or not all(
+        os.path.exists(src) for src in pack.assets(module_dir(name)).values()
+    ):
+        pack.close()
+        return None
+    return pack
@@ -4,9 +4,15 @@ Client SDK + Claude MCP plugin + skill server framework.
 15 stages covering the full TypeScript monorepo.
 """
 
-import shutil, os
+import functools, os
 
 from code_gen.base import mit_license, typescript_gitignore
+from code_gen.materialize import FrozenStages, place_file
+from code_gen.pinion_os_skills import (
+    DEFAULT_PRICE, NETWORK,
+    catalog_ts, client_skills_ts, openclaw_manifest_json, plugin_tools_ts,
+)
+from code_gen.variants import Slot
 
 
 BANNER_SRC = os.path.join(
@@ -14,21 +20,40 @@ BANNER_SRC = os.path.join(
     "assets", "banner.png",
 )
 
+# binary files copied into the repo alongside the generated sources
+ASSETS = {"assets/banner.png": BANNER_SRC}
+
+# literals that vary between published flavors (see code_gen.variants);
+# package.json keeps "base" as a keyword, and doc comments listing both
+# networks are left as they are. Chain id, RPC URL and USDC contract are
+# looked up from the network at runtime, so only the network is slotted.
+SLOTS = (
+    Slot("network", NETWORK, (
+        r'(?i:network)["\']?\s*(?:[:=,]|\|\|)\s*"(base)"(?! or )',
+        # positional network argument of generateManifest() in the tests
+        r'\bskills,\s*"(base)"',
+    ), r"[a-z0-9-]+", ("package.json",)),
+    Slot("price", DEFAULT_PRICE, (r"(\$0\.01)\b",), r"\$\d+(?:\.\d+)?"),
+    Slot("port", "4020", (r"(?<![\w.])(4020)\b",), r"\d{1,5}"),
+    Slot("api_url", "https://pinionos.com/skill", (
+        r"(https://pinionos\.com/skill)\b",
+    ), r"https?://[^\s\"'\\`]+"),
+    Slot("version", "0.2.0", (
+        r'"?version"?:\s*"(0\.2\.0)"',
+    ), r"\d+\.\d+\.\d+(?:-[0-9A-Za-z.-]+)?"),
+)
 
-def _copy_banner(repo_dir):
-    """Copy generated banner into repo assets/."""
-    dst = os.path.join(repo_dir, "assets", "banner.png")
-    os.makedirs(os.path.dirname(dst), exist_ok=True)
-    shutil.copy2(BANNER_SRC, dst)
 
+def _copy_banner(repo_dir, mode="auto"):
+    """Place generated banner into repo assets/, skipping it if unchanged."""
+    return place_file(BANNER_SRC, os.path.join(repo_dir, "assets", "banner.png"), mode)
 
-def pinion_os_stages():
-    return [
-        # ── Stage 0: Scaffold ─────────────────────────────────────────────
-        {
-            ".gitignore": typescript_gitignore() + "*.tsbuildinfo\n.env.local\n",
-            "LICENSE": mit_license(),
-            "tsconfig.json": """{
+
+# ── Stage 0: Scaffold ─────────────────────────────────────────────
+def _stage_0():
+    yield ".gitignore", typescript_gitignore() + "*.tsbuildinfo\n.env.local\n"
+    yield "LICENSE", mit_license()
+    yield "tsconfig.json", """{
   "compilerOptions": {
     "target": "ES2022",
     "module": "Node16",
@@ -47,8 +72,8 @@ def pinion_os_stages():
   "include": ["src/**/*"],
   "exclude": ["node_modules", "dist", "tests", "examples"]
 }
-""",
-            "package.json": """{
+"""
+    yield "package.json", """{
   "name": "pinion-os",
   "version": "0.1.0",
   "description": "Client SDK, Claude plugin and skill framework for the Pinion protocol. x402 micropayments on Base.",
@@ -97,6 +122,7 @@ def pinion_os_stages():
     "dotenv": "^16.4.0",
     "@modelcontextprotocol/sdk": "^1.5.0",
     "@noble/hashes": "^1.4.0",
+    "undici": "^6.19.0",
     "commander": "^12.0.0",
     "chalk": "^5.3.0"
   },
@@ -109,8 +135,8 @@ def pinion_os_stages():
     "node": ">=18"
   }
 }
-""",
-            "README.md": """# pinion-os
+"""
+    yield "README.md", """# pinion-os
 
 Client SDK, Claude plugin and skill framework for the Pinion protocol.
 
@@ -119,17 +145,17 @@ Work in progress.
 ## License
 
 MIT
-""",
-            "src/index.ts": """// pinion-os public API
+"""
+    yield "src/index.ts", """// pinion-os public API
 // SDK exports
 export { PinionClient } from "./client/index.js";
 export type { PinionConfig, SkillResponse } from "./client/types.js";
-""",
-        },
+"""
 
-        # ── Stage 1: Shared constants + RPC + errors ─────────────────────
-        {
-            "src/shared/constants.ts": """// network and contract constants for Base mainnet
+
+# ── Stage 1: Shared constants + RPC + errors ─────────────────────
+def _stage_1():
+    yield "src/shared/constants.ts", """// network and contract constants for Base mainnet
 
 export const BASE_RPC_URL = "https://mainnet.base.org";
 export const BASE_CHAIN_ID = 8453;
@@ -142,6 +168,10 @@ export const USDC_DECIMALS = 6;
 export const USDC_NAME = "USD Coin";
 export const USDC_VERSION = "2";
 
+// USDC on Base Sepolia (its EIP-712 name differs from mainnet)
+export const USDC_SEPOLIA_ADDRESS = "0x036CbD53842c5426634e7929541eC2318f3dCF7e";
+export const USDC_SEPOLIA_NAME = "USDC";
+
 // default Pinion service URL
 export const PINION_API_URL = "https://pinionos.com/skill";
 
@@ -160,11 +190,31 @@ export function getRpcUrl(network: string): string {
     if (network === "base-sepolia") return BASE_SEPOLIA_RPC_URL;
     return BASE_RPC_URL;
 }
-""",
-            "src/shared/rpc.ts": """// base JSON-RPC helper
 
+export function getUsdcAddress(network: string): string {
+    if (network === "base-sepolia") return USDC_SEPOLIA_ADDRESS;
+    return USDC_ADDRESS;
+}
+
+export function getUsdcName(network: string): string {
+    if (network === "base-sepolia") return USDC_SEPOLIA_NAME;
+    return USDC_NAME;
+}
+"""
+    yield "src/shared/rpc.ts", """// base JSON-RPC helper
+// requests go through one keep-alive connection pool per RPC endpoint,
+// so skill calls reuse warm TLS connections instead of dialing each time
+
+import { Agent } from "undici";
 import { getRpcUrl } from "./constants.js";
 
+interface RpcCall {
+    jsonrpc: string;
+    id: number;
+    method: string;
+    params: any[];
+}
+
 export interface RpcResponse {
     jsonrpc: string;
     id: number;
@@ -172,25 +222,219 @@ export interface RpcResponse {
     error?: { code: number; message: string };
 }
 
-export async function baseRpc(
-    method: string,
-    params: any[] = [],
-    network = "base",
-): Promise<any> {
+export interface RpcPoolOptions {
+    /** max open sockets per RPC endpoint */
+    connections?: number;
+    /** requests in flight per socket (HTTP/1.1 pipelining, 1 = off) */
+    pipelining?: number;
+    /** how long an idle socket stays open, in ms */
+    keepAliveTimeout?: number;
+}
+
+let poolOptions: RpcPoolOptions = {
+    connections: Number(process.env.PINION_RPC_CONNECTIONS) || 16,
+    pipelining: Number(process.env.PINION_RPC_PIPELINING) || 1,
+    keepAliveTimeout: 30_000,
+};
+
+// RPC URL -> pooled agent, created on first use
+const agents = new Map<string, Agent>();
+
+function rpcAgent(url: string): Agent {
+    let agent = agents.get(url);
+    if (!agent) {
+        agent = new Agent(poolOptions);
+        agents.set(url, agent);
+    }
+    return agent;
+}
+
+/** close every pooled connection (e.g. on shutdown) */
+export async function closeRpcPools(): Promise<void> {
+    const open = [...agents.values()];
+    agents.clear();
+    await Promise.all(open.map((agent) => agent.close()));
+}
+
+/** change pool sizing; open pools are closed and rebuilt on next use */
+export async function configureRpcPool(options: RpcPoolOptions): Promise<void> {
+    poolOptions = { ...poolOptions, ...options };
+    await closeRpcPools();
+}
+
+// read-only methods: safe for undici to pipeline and retry
+const READ_METHODS = new Set([
+    "eth_blockNumber",
+    "eth_call",
+    "eth_chainId",
+    "eth_estimateGas",
+    "eth_feeHistory",
+    "eth_gasPrice",
+    "eth_getBalance",
+    "eth_getBlockByHash",
+    "eth_getBlockByNumber",
+    "eth_getCode",
+    "eth_getLogs",
+    "eth_getStorageAt",
+    "eth_getTransactionByHash",
+    "eth_getTransactionCount",
+    "eth_getTransactionReceipt",
+    "eth_maxPriorityFeePerGas",
+    "net_version",
+]);
+
+function isRead(payload: RpcCall | RpcCall[]): boolean {
+    const calls = Array.isArray(payload) ? payload : [payload];
+    return calls.every((c) => READ_METHODS.has(c.method));
+}
+
+// POST a JSON-RPC request or batch through the endpoint's pool.
+// undici only pipelines (and retries) requests marked idempotent, so
+// the flag is set only when every method in the payload is a read;
+// a write such as eth_sendRawTransaction is sent exactly once.
+async function post(
+    network: string,
+    payload: RpcCall | RpcCall[],
+): Promise<unknown> {
     const url = getRpcUrl(network);
-    const res = await fetch(url, {
+    const { origin, pathname, search } = new URL(url);
+    const { body } = await rpcAgent(url).request({
+        origin,
+        path: pathname + search,
         method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ jsonrpc: "2.0", id: 1, method, params }),
+        headers: { "content-type": "application/json" },
+        body: JSON.stringify(payload),
+        idempotent: isRead(payload),
     });
+    return body.json();
+}
 
-    const json: RpcResponse = await res.json();
+async function request(
+    method: string,
+    params: any[],
+    network: string,
+): Promise<any> {
+    const json = (await post(network, {
+        jsonrpc: "2.0",
+        id: 1,
+        method,
+        params,
+    })) as RpcResponse;
     if (json.error) {
         throw new RpcError(json.error.message, json.error.code);
     }
     return json.result;
 }
 
+// identical calls (network, method, params) currently in flight
+const inflight = new Map<string, Promise<any>>();
+
+// concurrent identical calls share one upstream request and its result
+function singleFlight(
+    method: string,
+    params: any[],
+    network: string,
+    call: () => Promise<any>,
+): Promise<any> {
+    const key = `${network} ${method} ${JSON.stringify(params)}`;
+    let pending = inflight.get(key);
+    if (!pending) {
+        pending = call().finally(() => inflight.delete(key));
+        inflight.set(key, pending);
+    }
+    return pending;
+}
+
+export function baseRpc(
+    method: string,
+    params: any[] = [],
+    network = "base",
+): Promise<any> {
+    return singleFlight(method, params, network, () =>
+        request(method, params, network),
+    );
+}
+
+interface QueuedCall {
+    method: string;
+    params: any[];
+    resolve: (result: any) => void;
+    reject: (err: Error) => void;
+}
+
+// network -> calls waiting for the next batch flush
+const queued = new Map<string, QueuedCall[]>();
+
+/**
+ * Same contract as baseRpc, but calls made in the same event-loop turn
+ * for the same network go upstream as one JSON-RPC batch POST.
+ * Like baseRpc, identical calls already in flight are not sent again.
+ */
+export function batchRpc(
+    method: string,
+    params: any[] = [],
+    network = "base",
+): Promise<any> {
+    return singleFlight(method, params, network, () =>
+        new Promise((resolve, reject) => {
+            let calls = queued.get(network);
+            if (!calls) {
+                calls = [];
+                queued.set(network, calls);
+                setImmediate(() => void flush(network));
+            }
+            calls.push({ method, params, resolve, reject });
+        }),
+    );
+}
+
+async function flush(network: string): Promise<void> {
+    const calls = queued.get(network) ?? [];
+    queued.delete(network);
+    if (calls.length === 1) {
+        const [call] = calls;
+        request(call.method, call.params, network).then(call.resolve, call.reject);
+        return;
+    }
+
+    try {
+        const replies = await post(
+            network,
+            calls.map((c, id) => ({
+                jsonrpc: "2.0",
+                id,
+                method: c.method,
+                params: c.params,
+            })),
+        );
+        if (!Array.isArray(replies)) {
+            // batch rejected as a whole, e.g. provider batch limit
+            const error = (replies as RpcResponse)?.error;
+            throw new RpcError(
+                error?.message ?? "invalid batch response",
+                error?.code ?? -32603,
+            );
+        }
+
+        // replies may come back in any order
+        const byId = new Map<number, RpcResponse>(
+            (replies as RpcResponse[]).map((r) => [r.id, r]),
+        );
+        calls.forEach((call, id) => {
+            const reply = byId.get(id);
+            if (!reply) {
+                call.reject(new RpcError("missing batch response", -32603));
+            } else if (reply.error) {
+                call.reject(new RpcError(reply.error.message, reply.error.code));
+            } else {
+                call.resolve(reply.result);
+            }
+        });
+    } catch (err: any) {
+        for (const call of calls) call.reject(err);
+    }
+}
+
 export class RpcError extends Error {
     code: number;
     constructor(message: string, code: number) {
@@ -199,8 +443,236 @@ export class RpcError extends Error {
         this.code = code;
     }
 }
-""",
-            "src/shared/errors.ts": """// error types for pinion-os
+"""
+    yield "src/shared/cache.ts", """// byte-bounded LRU cache with per-entry expiry
+
+interface Entry<V> {
+    value: V;
+    bytes: number;
+    expires: number;
+}
+
+export class LruCache<V> {
+    // Map keeps insertion order: the first key is the least recently used
+    private entries = new Map<string, Entry<V>>();
+    private used = 0;
+
+    constructor(readonly maxBytes: number) {}
+
+    get bytes(): number {
+        return this.used;
+    }
+
+    get size(): number {
+        return this.entries.size;
+    }
+
+    get(key: string): V | undefined {
+        const entry = this.entries.get(key);
+        if (!entry) return undefined;
+        if (entry.expires <= Date.now()) {
+            this.delete(key);
+            return undefined;
+        }
+        this.entries.delete(key);
+        this.entries.set(key, entry);
+        return entry.value;
+    }
+
+    /** store value for ttlMs (default: until evicted) */
+    set(key: string, value: V, ttlMs = Infinity): void {
+        this.delete(key);
+        const bytes = key.length + Buffer.byteLength(JSON.stringify(value) ?? "");
+        if (bytes > this.maxBytes) return;
+        this.entries.set(key, { value, bytes, expires: Date.now() + ttlMs });
+        this.used += bytes;
+        for (const [oldest, entry] of this.entries) {
+            if (this.used <= this.maxBytes) break;
+            this.entries.delete(oldest);
+            this.used -= entry.bytes;
+        }
+    }
+
+    delete(key: string): boolean {
+        const entry = this.entries.get(key);
+        if (!entry) return false;
+        this.entries.delete(key);
+        this.used -= entry.bytes;
+        return true;
+    }
+
+    clear(): void {
+        this.entries.clear();
+        this.used = 0;
+    }
+}
+"""
+    yield "src/shared/rpc-cache.ts", """// finality-aware cache over the RPC layer
+// transactions and receipts in a finalized block never change, so they
+// stay until evicted. A mined block can still be reorged out before L1
+// finality, so those lookups, like pending or missing ones, expire after
+// a couple of seconds.
+// "latest" reads are pinned to the last known head block and keyed by it;
+// while reads keep coming the head is polled in the background, so a read
+// never waits on it.
+
+import { LruCache } from "./cache.js";
+import { batchRpc } from "./rpc.js";
+
+const UNFINALIZED_TTL_MS = 2_000;
+const LATEST_TTL_MS = 30_000;
+// the finalized block only moves forward, so a stale one just caches less
+const FINALIZED_MAX_AGE_MS = 30_000;
+// Base produces a block about every 2 s
+const HEAD_POLL_MS = 2_000;
+// past this the poller is failing: stop pinning reads to the old head
+const HEAD_MAX_AGE_MS = 10_000;
+// stop polling after this long without a read; the next read restarts it
+const HEAD_IDLE_MS = 60_000;
+
+const cache = new LruCache<any>(
+    Number(process.env.PINION_RPC_CACHE_BYTES) || 32 * 1024 * 1024,
+);
+
+async function cached(
+    key: string,
+    ttl: (result: any) => number | Promise<number>,
+    call: () => Promise<any>,
+): Promise<any> {
+    const hit = cache.get(key);
+    if (hit !== undefined) return hit;
+    const result = await call();
+    cache.set(key, result, await ttl(result));
+    return result;
+}
+
+// network -> last finalized block number (hex) and when it was seen
+const finalized = new Map<string, { block: string; at: number }>();
+
+async function finalizedBlock(network: string): Promise<string> {
+    const known = finalized.get(network);
+    if (known && Date.now() - known.at <= FINALIZED_MAX_AGE_MS) return known.block;
+    const block = await batchRpc("eth_getBlockByNumber", ["finalized", false], network);
+    if (!block?.number) throw new Error("no finalized block");
+    finalized.set(network, { block: block.number, at: Date.now() });
+    return block.number;
+}
+
+// forever once the tx's block is finalized, briefly before that
+async function finalityTtl(
+    blockNumber: string | null | undefined,
+    network: string,
+): Promise<number> {
+    if (!blockNumber) return UNFINALIZED_TTL_MS;
+    try {
+        const final = await finalizedBlock(network);
+        return BigInt(blockNumber) <= BigInt(final) ? Infinity : UNFINALIZED_TTL_MS;
+    } catch {
+        // provider without the "finalized" tag: never cache for good
+        return UNFINALIZED_TTL_MS;
+    }
+}
+
+export function getTransaction(hash: string, network = "base"): Promise<any> {
+    return cached(
+        `${network} tx ${hash.toLowerCase()}`,
+        (tx) => finalityTtl(tx?.blockNumber, network),
+        () => batchRpc("eth_getTransactionByHash", [hash], network),
+    );
+}
+
+export function getTransactionReceipt(hash: string, network = "base"): Promise<any> {
+    return cached(
+        `${network} receipt ${hash.toLowerCase()}`,
+        (receipt) => finalityTtl(receipt?.blockNumber, network),
+        () => batchRpc("eth_getTransactionReceipt", [hash], network),
+    );
+}
+
+// network -> last head block number (hex) and when it was seen
+const heads = new Map<string, { block: string; at: number }>();
+const pollers = new Map<string, ReturnType<typeof setInterval>>();
+// network -> time of the last read that wanted the head
+const lastRead = new Map<string, number>();
+// networks whose poll is failing, so an outage is logged once
+const failing = new Set<string>();
+
+function refreshHead(network: string): Promise<string> {
+    return batchRpc("eth_blockNumber", [], network).then((block: string) => {
+        heads.set(network, { block, at: Date.now() });
+        return block;
+    });
+}
+
+function pollHead(network: string): void {
+    if (Date.now() - (lastRead.get(network) ?? 0) > HEAD_IDLE_MS) {
+        clearInterval(pollers.get(network));
+        pollers.delete(network);
+        return;
+    }
+    refreshHead(network).then(
+        () => failing.delete(network),
+        (err) => {
+            if (failing.has(network)) return;
+            failing.add(network);
+            console.error("head poll error:", err.message);
+        },
+    );
+}
+
+function trackHead(network: string): void {
+    lastRead.set(network, Date.now());
+    if (pollers.has(network)) return;
+    const timer = setInterval(() => pollHead(network), HEAD_POLL_MS);
+    // polling alone shouldn't keep the process running
+    timer.unref();
+    pollers.set(network, timer);
+}
+
+/** last known head block number (hex), fetched if none is recent */
+export function headBlock(network = "base"): Promise<string> {
+    trackHead(network);
+    const head = heads.get(network);
+    return head && Date.now() - head.at <= HEAD_MAX_AGE_MS
+        ? Promise.resolve(head.block)
+        : refreshHead(network);
+}
+
+function latestKey(network: string, method: string, pinned: any[]): string {
+    return `${network} ${method} ${JSON.stringify(pinned)}`;
+}
+
+/**
+ * A read at the "latest" tag, answered for (and cached by) the last known
+ * head block. Costs at most one batched round trip: without a fresh head
+ * the read goes out at "latest" in the same batch as eth_blockNumber.
+ */
+export async function latestRpc(
+    method: string,
+    params: any[] = [],
+    network = "base",
+): Promise<any> {
+    trackHead(network);
+    const head = heads.get(network);
+    if (head && Date.now() - head.at <= HEAD_MAX_AGE_MS) {
+        const pinned = params.map((p) => (p === "latest" ? head.block : p));
+        return cached(
+            latestKey(network, method, pinned),
+            () => LATEST_TTL_MS,
+            () => batchRpc(method, pinned, network),
+        );
+    }
+
+    const [block, result] = await Promise.all([
+        refreshHead(network),
+        batchRpc(method, params, network),
+    ]);
+    const pinned = params.map((p) => (p === "latest" ? block : p));
+    cache.set(latestKey(network, method, pinned), result, LATEST_TTL_MS);
+    return result;
+}
+"""
+    yield "src/shared/errors.ts", """// error types for pinion-os
 
 export class PinionError extends Error {
     constructor(message: string) {
@@ -233,12 +705,12 @@ export class ConfigError extends PinionError {
         this.name = "ConfigError";
     }
 }
-""",
-        },
+"""
+
 
-        # ── Stage 2: x402 signing ────────────────────────────────────────
-        {
-            "src/client/types.ts": """// client types
+# ── Stage 2: x402 signing ────────────────────────────────────────
+def _stage_2():
+    yield "src/client/types.ts", """// client types
 
 export interface PinionConfig {
     /** hex-encoded private key for signing x402 payments */
@@ -324,17 +796,17 @@ export interface WalletResult {
 export interface ChatResult {
     response: string;
 }
-""",
-            "src/client/x402.ts": """// x402 payment signing for Node.js
+"""
+    yield "src/client/x402.ts", """// x402 payment signing for Node.js
 // EIP-3009 TransferWithAuthorization via EIP-712 typed data
 // adapted from ethers.js wallet signing (not browser-based)
 
 import { ethers } from "ethers";
 import {
-    USDC_ADDRESS,
-    USDC_NAME,
     USDC_VERSION,
     getChainId,
+    getUsdcAddress,
+    getUsdcName,
 } from "../shared/constants.js";
 import type { PaymentRequirements, PaymentPayload } from "./types.js";
 
@@ -363,10 +835,10 @@ export async function signX402Payment(
 
     // EIP-712 domain matching USDC on Base
     const domain: ethers.TypedDataDomain = {
-        name: requirements.extra?.name || USDC_NAME,
+        name: requirements.extra?.name || getUsdcName(requirements.network),
         version: requirements.extra?.version || USDC_VERSION,
         chainId,
-        verifyingContract: requirements.asset || USDC_ADDRESS,
+        verifyingContract: requirements.asset || getUsdcAddress(requirements.network),
     };
 
     // EIP-712 types for TransferWithAuthorization (EIP-3009)
@@ -427,12 +899,12 @@ export function parsePaymentRequirements(body: any): {
     }
     throw new Error("could not parse payment requirements from 402 response");
 }
-""",
-        },
+"""
 
-        # ── Stage 3: Client core ─────────────────────────────────────────
-        {
-            "src/client/index.ts": """// PinionClient -- main entry point for calling pinion skills
+
+# ── Stage 3: Client core ─────────────────────────────────────────
+def _stage_3():
+    yield "src/client/index.ts", """// PinionClient -- main entry point for calling pinion skills
 
 import { ethers } from "ethers";
 import { PINION_API_URL } from "../shared/constants.js";
@@ -535,85 +1007,23 @@ export class PinionClient {
         };
     }
 }
-""",
-        },
-
-        # ── Stage 4: Client skills ───────────────────────────────────────
-        {
-            "src/client/skills.ts": """// typed wrappers for each pinion skill
-
-import type { PinionClient } from "./index.js";
-import { SkillError } from "../shared/errors.js";
-import type {
-    BalanceResult,
-    TxResult,
-    PriceResult,
-    WalletResult,
-    ChatResult,
-    SkillResponse,
-} from "./types.js";
-
-export class SkillMethods {
-    private client: PinionClient;
-
-    constructor(client: PinionClient) {
-        this.client = client;
-    }
-
-    /** Get ETH and USDC balances for an address on Base. */
-    async balance(address: string): Promise<SkillResponse<BalanceResult>> {
-        if (!/^0x[0-9a-fA-F]{40}$/.test(address)) {
-            throw new SkillError("balance", "invalid ethereum address");
-        }
-        return this.client.request<BalanceResult>(
-            "GET",
-            `/balance/${address}`,
-        );
-    }
+"""
 
-    /** Get decoded transaction details for a Base tx hash. */
-    async tx(hash: string): Promise<SkillResponse<TxResult>> {
-        if (!/^0x[0-9a-fA-F]{64}$/.test(hash)) {
-            throw new SkillError("tx", "invalid transaction hash");
-        }
-        return this.client.request<TxResult>("GET", `/tx/${hash}`);
-    }
 
-    /** Get current USD price for a token (ETH, USDC, WETH, etc). */
-    async price(token: string): Promise<SkillResponse<PriceResult>> {
-        return this.client.request<PriceResult>(
-            "GET",
-            `/price/${token.toUpperCase()}`,
-        );
-    }
+# ── Stage 4: Client skills ───────────────────────────────────────
+def _stage_4():
+    yield "src/client/skills.ts", client_skills_ts()
 
-    /** Generate a fresh Base wallet keypair. */
-    async wallet(): Promise<SkillResponse<WalletResult>> {
-        return this.client.request<WalletResult>("GET", "/wallet/generate");
-    }
 
-    /** Chat with the Pinion AI agent. */
-    async chat(
-        message: string,
-        history: Array<{ role: string; content: string }> = [],
-    ): Promise<SkillResponse<ChatResult>> {
-        const messages = [
-            ...history,
-            { role: "user", content: message },
-        ];
-        return this.client.request<ChatResult>("POST", "/chat", { messages });
-    }
-}
-""",
-        },
-
-        # ── Stage 5: Skills -- balance + tx ──────────────────────────────
-        {
-            "src/skills/balance.ts": """// balance skill -- ETH and USDC balance lookup on Base
+# ── Stage 5: Skills -- balance + tx ──────────────────────────────
+def _stage_5():
+    yield "src/skills/balance.ts", """// balance skill -- ETH and USDC balance lookup on Base
 
 import type { Request, Response } from "express";
-import { baseRpc } from "../shared/rpc.js";
-import { USDC_ADDRESS } from "../shared/constants.js";
+import { latestRpc } from "../shared/rpc-cache.js";
+import { getUsdcAddress } from "../shared/constants.js";
+
+const NETWORK = "base";
 
 export async function balanceHandler(req: Request, res: Response) {
     try {
@@ -624,21 +1034,28 @@ export async function balanceHandler(req: Request, res: Response) {
             return;
         }
 
-        const ethHex = await baseRpc("eth_getBalance", [address, "latest"]);
-        const ethBalance = parseInt(ethHex, 16) / 1e18;
-
         // USDC balanceOf(address)
         const selector = "0x70a08231";
         const padded = address.substring(2).toLowerCase().padStart(64, "0");
-        const usdcHex = await baseRpc("eth_call", [
-            { to: USDC_ADDRESS, data: `${selector}${padded}` },
-            "latest",
+
+        // both reads go upstream in one batch request, cached per block
+        const [ethHex, usdcHex] = await Promise.all([
+            latestRpc("eth_getBalance", [address, "latest"], NETWORK),
+            latestRpc(
+                "eth_call",
+                [
+                    { to: getUsdcAddress(NETWORK), data: `${selector}${padded}` },
+                    "latest",
+                ],
+                NETWORK,
+            ),
         ]);
+        const ethBalance = parseInt(ethHex, 16) / 1e18;
         const usdcBalance = parseInt(usdcHex, 16) / 1e6;
 
         res.json({
             address,
-            network: "base",
+            network: NETWORK,
             balances: {
                 ETH: ethBalance.toFixed(6),
                 USDC: usdcBalance.toFixed(2),
@@ -653,11 +1070,11 @@ export async function balanceHandler(req: Request, res: Response) {
         });
     }
 }
-""",
-            "src/skills/tx.ts": """// tx skill -- transaction lookup and decoder on Base
+"""
+    yield "src/skills/tx.ts", """// tx skill -- transaction lookup and decoder on Base
 
 import type { Request, Response } from "express";
-import { baseRpc } from "../shared/rpc.js";
+import { getTransaction, getTransactionReceipt } from "../shared/rpc-cache.js";
 
 export async function txHandler(req: Request, res: Response) {
     try {
@@ -668,14 +1085,17 @@ export async function txHandler(req: Request, res: Response) {
             return;
         }
 
-        const tx = await baseRpc("eth_getTransactionByHash", [hash]);
+        // tx and receipt go upstream in one batch request; finalized
+        // ones are served from the RPC cache afterwards
+        const [tx, receipt] = await Promise.all([
+            getTransaction(hash),
+            getTransactionReceipt(hash),
+        ]);
         if (!tx) {
             res.status(404).json({ error: "transaction not found" });
             return;
         }
 
-        const receipt = await baseRpc("eth_getTransactionReceipt", [hash]);
-
         res.json({
             hash: tx.hash,
             network: "base",
@@ -703,12 +1123,14 @@ export async function txHandler(req: Request, res: Response) {
         });
     }
 }
-""",
-        },
+"""
+
 
-        # ── Stage 6: Skills -- price + wallet + catalog ──────────────────
-        {
-            "src/skills/price.ts": """// price skill -- token price lookup via coingecko
+# ── Stage 6: Skills -- price + wallet + catalog ──────────────────
+def _stage_6():
+    yield "src/skills/price.ts", """// price skill -- token price lookup via coingecko
+// every supported id is fetched in one simple/price call on a background
+// interval; requests are answered from the last snapshot in memory
 
 import type { Request, Response } from "express";
 
@@ -721,6 +1143,67 @@ const TOKEN_MAP: Record<string, string> = {
     USDT: "tether",
 };
 
+const PRICE_URL =
+    "https://api.coingecko.com/api/v3/simple/price" +
+    `?ids=${[...new Set(Object.values(TOKEN_MAP))].join(",")}` +
+    "&vs_currencies=usd&include_24hr_change=true";
+
+const REFRESH_MS = Number(process.env.PINION_PRICE_REFRESH_MS) || 30_000;
+// how long a snapshot may be served while coingecko keeps failing
+const MAX_STALE_MS = 10 * 60_000;
+
+interface Quote {
+    usd: number;
+    usd_24h_change?: number;
+}
+
+let snapshot: { quotes: Record<string, Quote>; fetchedAt: number } | null = null;
+let refreshing: Promise<void> | null = null;
+let timer: ReturnType<typeof setInterval> | null = null;
+
+// one upstream call at a time, however many requests are waiting on it
+function refresh(): Promise<void> {
+    if (!refreshing) {
+        refreshing = (async () => {
+            const res = await fetch(PRICE_URL);
+            if (!res.ok) {
+                throw new Error(`coingecko responded ${res.status}`);
+            }
+            const quotes = (await res.json()) as Record<string, Quote>;
+            snapshot = { quotes, fetchedAt: Date.now() };
+        })().finally(() => {
+            refreshing = null;
+        });
+    }
+    return refreshing;
+}
+
+function startRefresh(): void {
+    if (timer) return;
+    timer = setInterval(() => {
+        refresh().catch((err) => console.error("price refresh error:", err.message));
+    }, REFRESH_MS);
+    // the refresh loop alone shouldn't keep the process running
+    timer.unref();
+}
+
+// stale-while-revalidate: an old snapshot is served while a refresh runs,
+// and only a cold start or a snapshot past MAX_STALE_MS waits for upstream
+async function currentQuotes(): Promise<Record<string, Quote>> {
+    startRefresh();
+    const age = snapshot ? Date.now() - snapshot.fetchedAt : Infinity;
+    if (snapshot && age <= REFRESH_MS) {
+        return snapshot.quotes;
+    }
+    const pending = refresh();
+    if (snapshot && age <= MAX_STALE_MS) {
+        pending.catch(() => {});
+        return snapshot.quotes;
+    }
+    await pending;
+    return snapshot!.quotes;
+}
+
 export async function priceHandler(req: Request, res: Response) {
     try {
         const token = req.params.token.toUpperCase();
@@ -734,10 +1217,7 @@ export async function priceHandler(req: Request, res: Response) {
             return;
         }
 
-        const priceRes = await fetch(
-            `https://api.coingecko.com/api/v3/simple/price?ids=${geckoId}&vs_currencies=usd&include_24hr_change=true`,
-        );
-        const data = await priceRes.json();
+        const data = await currentQuotes();
 
         if (!data[geckoId]) {
             res.status(502).json({ error: "price data unavailable" });
@@ -761,12 +1241,15 @@ export async function priceHandler(req: Request, res: Response) {
         });
     }
 }
-""",
-            "src/skills/wallet.ts": """// wallet skill -- generate fresh Base keypair
+"""
+    yield "src/skills/wallet.ts", """// wallet skill -- generate fresh Base keypair
 
 import type { Request, Response } from "express";
 import { randomBytes, createECDH } from "crypto";
 import { keccak_256 } from "@noble/hashes/sha3";
+import { getChainId } from "../shared/constants.js";
+
+const NETWORK = "base";
 
 export async function walletHandler(_req: Request, res: Response) {
     try {
@@ -786,8 +1269,8 @@ export async function walletHandler(_req: Request, res: Response) {
         res.json({
             address,
             privateKey: "0x" + privKey.toString("hex"),
-            network: "base",
-            chainId: 8453,
+            network: NETWORK,
+            chainId: getChainId(NETWORK),
             note: "Fund this wallet with ETH for gas and USDC for x402 payments. Keep the private key safe.",
             timestamp: new Date().toISOString(),
         });
@@ -799,80 +1282,9 @@ export async function walletHandler(_req: Request, res: Response) {
         });
     }
 }
-""",
-            "src/skills/catalog.ts": """// catalog skill -- free endpoint listing available skills
-
-import type { Request, Response } from "express";
-
-export interface CatalogEntry {
-    endpoint: string;
-    method: string;
-    price: string;
-    currency: string;
-    network: string;
-    description: string;
-    example: string;
-}
-
-export function catalogHandler(payTo: string, network: string) {
-    return (_req: Request, res: Response) => {
-        const skills: CatalogEntry[] = [
-            {
-                endpoint: "/balance/:address",
-                method: "GET",
-                price: "$0.01",
-                currency: "USDC",
-                network,
-                description:
-                    "Get ETH and USDC balances for any Base address",
-                example: "/balance/0x101Cd32b9bEEE93845Ead7Bc604a5F1873330acf",
-            },
-            {
-                endpoint: "/tx/:hash",
-                method: "GET",
-                price: "$0.01",
-                currency: "USDC",
-                network,
-                description:
-                    "Get decoded transaction details for any Base tx",
-                example: "/tx/0x...",
-            },
-            {
-                endpoint: "/price/:token",
-                method: "GET",
-                price: "$0.01",
-                currency: "USDC",
-                network,
-                description:
-                    "Get current USD price for ETH or other tokens",
-                example: "/price/ETH",
-            },
-            {
-                endpoint: "/wallet/generate",
-                method: "GET",
-                price: "$0.01",
-                currency: "USDC",
-                network,
-                description:
-                    "Generate a fresh Base wallet keypair",
-                example: "/wallet/generate",
-            },
-            {
-                endpoint: "/chat",
-                method: "POST",
-                price: "$0.01",
-                currency: "USDC",
-                network,
-                description:
-                    "Chat with the Pinion AI agent",
-                example: "POST /chat { messages: [...] }",
-            },
-        ];
-        res.json({ skills, payTo, network });
-    };
-}
-""",
-            "src/skills/chat.ts": """// chat skill -- AI agent powered by Claude
+"""
+    yield "src/skills/catalog.ts", catalog_ts()
+    yield "src/skills/chat.ts", """// chat skill -- AI agent powered by Claude
 
 import type { Request, Response } from "express";
 
@@ -924,12 +1336,12 @@ export function createChatHandler(anthropicApiKey: string) {
         }
     };
 }
-""",
-        },
+"""
 
-        # ── Stage 7: Server framework ────────────────────────────────────
-        {
-            "src/server/types.ts": """// server framework types
+
+# ── Stage 7: Server framework ────────────────────────────────────
+def _stage_7():
+    yield "src/server/types.ts", """// server framework types
 
 import type { Request, Response } from "express";
 
@@ -954,8 +1366,8 @@ export interface SkillServerConfig {
     /** enable CORS headers for x402 */
     cors?: boolean;
 }
-""",
-            "src/server/middleware.ts": """// x402 middleware wrapper for express
+"""
+    yield "src/server/middleware.ts", """// x402 middleware wrapper for express
 
 import type { Express } from "express";
 import type { SkillDefinition } from "./types.js";
@@ -1005,8 +1417,8 @@ export function applyPaymentMiddleware(
         }),
     );
 }
-""",
-            "src/server/index.ts": """// skill server factory
+"""
+    yield "src/server/index.ts", """// skill server factory
 
 import express from "express";
 import type { SkillDefinition, SkillServerConfig } from "./types.js";
@@ -1090,8 +1502,8 @@ export function createSkillServer(config: SkillServerConfig) {
         },
     };
 }
-""",
-            "src/server/skill.ts": """// skill() helper for defining skills
+"""
+    yield "src/server/skill.ts", """// skill() helper for defining skills
 
 import type { Request, Response } from "express";
 import type { SkillDefinition } from "./types.js";
@@ -1126,12 +1538,12 @@ export function skill(name: string, opts: SkillOptions): SkillDefinition {
         handler: opts.handler,
     };
 }
-""",
-        },
+"""
+
 
-        # ── Stage 8: OpenClaw manifest ───────────────────────────────────
-        {
-            "src/server/manifest.ts": """// OpenClaw manifest generator
+# ── Stage 8: OpenClaw manifest ───────────────────────────────────
+def _stage_8():
+    yield "src/server/manifest.ts", """// OpenClaw manifest generator
 
 import type { SkillDefinition } from "./types.js";
 
@@ -1218,128 +1630,13 @@ function inferSchema(skill: SkillDefinition): Record<string, any> {
         required: params,
     };
 }
-""",
-            "openclaw.plugin.json": """{
-    "name": "pinion-chain-intel",
-    "version": "1.0.0",
-    "description": "On-chain intelligence for Base -- wallet balances, transaction lookups, and token prices. Paywalled via x402 USDC micropayments.",
-    "author": "Pinion Protocol",
-    "license": "MIT",
-    "homepage": "https://github.com/chu2bard/pinion-os",
-    "skills": [
-        {
-            "name": "balance",
-            "description": "Get ETH and USDC balances for any Base address",
-            "endpoint": "/balance/:address",
-            "method": "GET",
-            "price": "$0.01",
-            "currency": "USDC",
-            "network": "base",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "address": {
-                        "type": "string",
-                        "description": "Ethereum address (0x...)",
-                        "pattern": "^0x[0-9a-fA-F]{40}$"
-                    }
-                },
-                "required": ["address"]
-            }
-        },
-        {
-            "name": "tx",
-            "description": "Get decoded transaction details for any Base transaction",
-            "endpoint": "/tx/:hash",
-            "method": "GET",
-            "price": "$0.01",
-            "currency": "USDC",
-            "network": "base",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "hash": {
-                        "type": "string",
-                        "description": "Transaction hash (0x...)",
-                        "pattern": "^0x[0-9a-fA-F]{64}$"
-                    }
-                },
-                "required": ["hash"]
-            }
-        },
-        {
-            "name": "price",
-            "description": "Get current USD price for ETH or other Base tokens",
-            "endpoint": "/price/:token",
-            "method": "GET",
-            "price": "$0.01",
-            "currency": "USDC",
-            "network": "base",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "token": {
-                        "type": "string",
-                        "description": "Token symbol (ETH, USDC, WETH, DAI, USDT, CBETH)",
-                        "enum": ["ETH", "USDC", "WETH", "DAI", "USDT", "CBETH"]
-                    }
-                },
-                "required": ["token"]
-            }
-        },
-        {
-            "name": "wallet",
-            "description": "Generate a fresh Base wallet keypair",
-            "endpoint": "/wallet/generate",
-            "method": "GET",
-            "price": "$0.01",
-            "currency": "USDC",
-            "network": "base",
-            "inputSchema": {
-                "type": "object",
-                "properties": {},
-                "required": []
-            }
-        },
-        {
-            "name": "chat",
-            "description": "Chat with the Pinion AI agent",
-            "endpoint": "/chat",
-            "method": "POST",
-            "price": "$0.01",
-            "currency": "USDC",
-            "network": "base",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "messages": {
-                        "type": "array",
-                        "description": "Conversation messages",
-                        "items": {
-                            "type": "object",
-                            "properties": {
-                                "role": { "type": "string" },
-                                "content": { "type": "string" }
-                            }
-                        }
-                    }
-                },
-                "required": ["messages"]
-            }
-        }
-    ],
-    "x402": {
-        "facilitator": "https://facilitator.payai.network",
-        "network": "base",
-        "paymentToken": "USDC"
-    }
-}
-""",
-        },
+"""
+    yield "openclaw.plugin.json", openclaw_manifest_json()
 
-        # ── Stage 9: MCP plugin core ─────────────────────────────────────
-        {
-            "src/plugin/server.ts": """// MCP server implementation for Claude integration
+
+# ── Stage 9: MCP plugin core ─────────────────────────────────────
+def _stage_9():
+    yield "src/plugin/server.ts", """// MCP server implementation for Claude integration
 
 import { Server } from "@modelcontextprotocol/sdk/server/index.js";
 import { StdioServerTransport } from "@modelcontextprotocol/sdk/server/stdio.js";
@@ -1367,7 +1664,8 @@ export async function startMcpServer(configOverride?: Partial<PluginConfig>) {
 
     // list available tools
     server.setRequestHandler(ListToolsRequestSchema, async () => ({
-        tools: getToolDefinitions(),
+        // the SDK wants a mutable array; the frozen entries are shared
+        tools: [...getToolDefinitions()],
     }));
 
     // handle tool calls
@@ -1382,166 +1680,13 @@ export async function startMcpServer(configOverride?: Partial<PluginConfig>) {
     // log to stderr so MCP hosts can see we initialized (stdout is for MCP protocol)
     console.error("pinion-os MCP server running (wallet: %s)", client.address);
 }
-""",
-        },
-
-        # ── Stage 10: MCP plugin tools ───────────────────────────────────
-        {
-            "src/plugin/tools.ts": """// tool definitions for Claude MCP integration
-
-import type { PinionClient } from "../client/index.js";
-
-interface ToolDef {
-    name: string;
-    description: string;
-    inputSchema: {
-        type: "object";
-        properties: Record<string, any>;
-        required?: string[];
-    };
-}
-
-export function getToolDefinitions(): ToolDef[] {
-    return [
-        {
-            name: "pinion_balance",
-            description:
-                "Get ETH and USDC balances for any Ethereum address on Base. Costs $0.01 USDC via x402.",
-            inputSchema: {
-                type: "object",
-                properties: {
-                    address: {
-                        type: "string",
-                        description:
-                            "Ethereum address to check (0x...)",
-                    },
-                },
-                required: ["address"],
-            },
-        },
-        {
-            name: "pinion_tx",
-            description:
-                "Get decoded transaction details for any Base transaction hash. Costs $0.01 USDC via x402.",
-            inputSchema: {
-                type: "object",
-                properties: {
-                    hash: {
-                        type: "string",
-                        description: "Transaction hash (0x...)",
-                    },
-                },
-                required: ["hash"],
-            },
-        },
-        {
-            name: "pinion_price",
-            description:
-                "Get current USD price for a token on Base (ETH, USDC, WETH, DAI, USDT, CBETH). Costs $0.01 USDC via x402.",
-            inputSchema: {
-                type: "object",
-                properties: {
-                    token: {
-                        type: "string",
-                        description: "Token symbol",
-                        enum: [
-                            "ETH",
-                            "USDC",
-                            "WETH",
-                            "DAI",
-                            "USDT",
-                            "CBETH",
-                        ],
-                    },
-                },
-                required: ["token"],
-            },
-        },
-        {
-            name: "pinion_wallet",
-            description:
-                "Generate a fresh Ethereum wallet keypair for the Base network. Costs $0.01 USDC via x402.",
-            inputSchema: {
-                type: "object",
-                properties: {},
-            },
-        },
-        {
-            name: "pinion_chat",
-            description:
-                "Chat with the Pinion AI agent about x402, on-chain data, or the Pinion protocol. Costs $0.01 USDC via x402.",
-            inputSchema: {
-                type: "object",
-                properties: {
-                    message: {
-                        type: "string",
-                        description: "Your message to the agent",
-                    },
-                },
-                required: ["message"],
-            },
-        },
-    ];
-}
-
-export async function handleToolCall(
-    client: PinionClient,
-    toolName: string,
-    args: Record<string, any>,
-): Promise<{ content: Array<{ type: string; text: string }> }> {
-    try {
-        let result: any;
-
-        switch (toolName) {
-            case "pinion_balance":
-                result = await client.skills.balance(args.address);
-                break;
-            case "pinion_tx":
-                result = await client.skills.tx(args.hash);
-                break;
-            case "pinion_price":
-                result = await client.skills.price(args.token);
-                break;
-            case "pinion_wallet":
-                result = await client.skills.wallet();
-                break;
-            case "pinion_chat":
-                result = await client.skills.chat(args.message);
-                break;
-            default:
-                return {
-                    content: [
-                        {
-                            type: "text",
-                            text: `unknown tool: ${toolName}`,
-                        },
-                    ],
-                };
-        }
+"""
 
-        const paid =
-            result.paidAmount !== "0"
-                ? ` (paid ${result.paidAmount} wei USDC)`
-                : "";
 
-        return {
-            content: [
-                {
-                    type: "text",
-                    text: JSON.stringify(result.data, null, 2) + paid,
-                },
-            ],
-        };
-    } catch (err: any) {
-        return {
-            content: [
-                { type: "text", text: `error: ${err.message}` },
-            ],
-        };
-    }
-}
-""",
-            ".claude-plugin/plugin.json": """{
+# ── Stage 10: MCP plugin tools ───────────────────────────────────
+def _stage_10():
+    yield "src/plugin/tools.ts", plugin_tools_ts()
+    yield ".claude-plugin/plugin.json", """{
   "name": "pinion-os",
   "description": "On-chain AI skills via x402 micropayments on Base",
   "version": "0.2.0",
@@ -1551,8 +1696,8 @@ export async function handleToolCall(
   "homepage": "https://github.com/chu2bard/pinion-os",
   "repository": "https://github.com/chu2bard/pinion-os"
 }
-""",
-            ".claude-plugin/marketplace.json": """{
+"""
+    yield ".claude-plugin/marketplace.json", """{
   "name": "pinion-os",
   "description": "Pinion protocol plugins for Claude Code",
   "plugins": [
@@ -1563,8 +1708,8 @@ export async function handleToolCall(
     }
   ]
 }
-""",
-            ".mcp.json": """{
+"""
+    yield ".mcp.json", """{
   "pinion": {
     "command": "npx",
     "args": ["pinion-os"],
@@ -1573,12 +1718,12 @@ export async function handleToolCall(
     }
   }
 }
-""",
-        },
+"""
 
-        # ── Stage 11: MCP plugin config + entry point ────────────────────
-        {
-            "src/plugin/config.ts": """// plugin configuration -- loads from env or args
+
+# ── Stage 11: MCP plugin config + entry point ────────────────────
+def _stage_11():
+    yield "src/plugin/config.ts", """// plugin configuration -- loads from env or args
 
 import { ConfigError } from "../shared/errors.js";
 import { PINION_API_URL } from "../shared/constants.js";
@@ -1623,8 +1768,8 @@ export async function loadPluginConfig(
             "base",
     };
 }
-""",
-            "src/plugin/index.ts": """#!/usr/bin/env node
+"""
+    yield "src/plugin/index.ts", """#!/usr/bin/env node
 // pinion-os MCP plugin entry point
 // run via: npx pinion-os
 // or add to claude_desktop_config.json
@@ -1635,12 +1780,12 @@ startMcpServer().catch((err) => {
     console.error("failed to start pinion MCP server:", err.message);
     process.exit(1);
 });
-""",
-        },
+"""
+
 
-        # ── Stage 12: Examples ───────────────────────────────────────────
-        {
-            "examples/use-sdk.ts": """// example: calling pinion skills via the SDK
+# ── Stage 12: Examples ───────────────────────────────────────────
+def _stage_12():
+    yield "examples/use-sdk.ts", """// example: calling pinion skills via the SDK
 
 import { PinionClient } from "../src/index.js";
 
@@ -1672,8 +1817,8 @@ async function main() {
 }
 
 main().catch(console.error);
-""",
-            "examples/custom-skill.ts": """// example: building a custom x402-paywalled skill
+"""
+    yield "examples/custom-skill.ts", """// example: building a custom x402-paywalled skill
 
 import { createSkillServer, skill } from "../src/server/index.js";
 
@@ -1724,8 +1869,8 @@ server.add(
 );
 
 server.listen();
-""",
-            "examples/claude-config.json": """{
+"""
+    yield "examples/claude-config.json", """{
     "mcpServers": {
         "pinion": {
             "command": "npx",
@@ -1736,12 +1881,12 @@ server.listen();
         }
     }
 }
-""",
-        },
+"""
+
 
-        # ── Stage 13: Tests ──────────────────────────────────────────────
-        {
-            "tests/client.test.ts": """import { describe, it } from "node:test";
+# ── Stage 13: Tests ──────────────────────────────────────────────
+def _stage_13():
+    yield "tests/client.test.ts", """import { describe, it } from "node:test";
 import assert from "node:assert/strict";
 
 // test client types and basic construction
@@ -1808,8 +1953,8 @@ describe("SkillMethods", () => {
         );
     });
 });
-""",
-            "tests/x402.test.ts": """import { describe, it } from "node:test";
+"""
+    yield "tests/x402.test.ts", """import { describe, it } from "node:test";
 import assert from "node:assert/strict";
 
 describe("x402 signing", () => {
@@ -1890,8 +2035,8 @@ describe("x402 signing", () => {
         );
     });
 });
-""",
-            "tests/server.test.ts": """import { describe, it } from "node:test";
+"""
+    yield "tests/server.test.ts", """import { describe, it } from "node:test";
 import assert from "node:assert/strict";
 
 describe("skill helper", () => {
@@ -1960,12 +2105,12 @@ describe("manifest generator", () => {
         assert.equal(manifest.x402.network, "base");
     });
 });
-""",
-        },
+"""
+
 
-        # ── Stage 14: README + polish ────────────────────────────────────
-        {
-            ".env.example": """# your wallet private key (hex, with 0x prefix)
+# ── Stage 14: README + polish ────────────────────────────────────
+def _stage_14():
+    yield ".env.example", """# your wallet private key (hex, with 0x prefix)
 # must have ETH for gas and USDC for x402 payments on Base
 PINION_PRIVATE_KEY=0x...
 
@@ -1975,14 +2120,22 @@ PINION_PRIVATE_KEY=0x...
 # optional: network (base or base-sepolia)
 # PINION_NETWORK=base
 
+# optional: RPC connection pool (sockets per endpoint, pipelining depth)
+# PINION_RPC_CONNECTIONS=16
+# PINION_RPC_PIPELINING=1
+# PINION_RPC_CACHE_BYTES=33554432
+
+# optional: how often the price skill refreshes coingecko prices (ms)
+# PINION_PRICE_REFRESH_MS=30000
+
 # optional: for running your own skill server
 # ADDRESS=0xYOUR_WALLET_ADDRESS
 # FACILITATOR_URL=https://facilitator.payai.network
 
 # optional: for the chat skill
 # ANTHROPIC_API_KEY=sk-ant-...
-""",
-            "src/index.ts": """// pinion-os public API
+"""
+    yield "src/index.ts", """// pinion-os public API
 
 // SDK exports
 export { PinionClient } from "./client/index.js";
@@ -1998,8 +2151,8 @@ export type {
 
 // server exports available via "pinion-os/server"
 // import { createSkillServer, skill } from "pinion-os/server"
-""",
-            "README.md": """<p align="center">
+"""
+    yield "README.md", """<p align="center">
   <img src="assets/banner.png" alt="Pinion OS" width="100%" />
 </p>
 
@@ -2252,6 +2405,10 @@ The server automatically:
 | `PINION_PRIVATE_KEY` | yes | -- | Hex private key (0x...) with USDC on Base |
 | `PINION_API_URL` | no | `https://pinionos.com/skill` | Override the skill API endpoint |
 | `PINION_NETWORK` | no | `base` | Network: `base` or `base-sepolia` |
+| `PINION_RPC_CONNECTIONS` | no | `16` | Keep-alive sockets per RPC endpoint |
+| `PINION_RPC_PIPELINING` | no | `1` | Pipelined requests per RPC socket |
+| `PINION_RPC_CACHE_BYTES` | no | `33554432` | Size of the tx/receipt/balance RPC cache |
+| `PINION_PRICE_REFRESH_MS` | no | `30000` | Background CoinGecko refresh interval for the price skill |
 | `ADDRESS` | server only | -- | Wallet address to receive payments |
 | `FACILITATOR_URL` | server only | `https://facilitator.payai.network` | x402 facilitator endpoint |
 | `ANTHROPIC_API_KEY` | chat skill | -- | Anthropic API key for the chat skill |
@@ -2289,6 +2446,8 @@ pinion-os/
     shared/            Shared utilities
       constants.ts       RPC URLs, contract addresses
       rpc.ts             Base JSON-RPC helper
+      rpc-cache.ts       finality-aware RPC result cache
+      cache.ts           byte-bounded LRU
       errors.ts          custom error classes
   examples/
     use-sdk.ts           SDK usage example
@@ -2355,8 +2514,8 @@ No need for elaborate commit messages. Just describe what changed and why.
 ## License
 
 MIT
-""",
-            "package.json": """{
+"""
+    yield "package.json", """{
   "name": "pinion-os",
   "version": "0.2.0",
   "description": "Client SDK, Claude plugin and skill framework for the Pinion protocol. x402 micropayments on Base.",
@@ -2405,7 +2564,8 @@ MIT
     "x402-express": "^1.1.0",
     "dotenv": "^16.4.0",
     "@modelcontextprotocol/sdk": "^1.5.0",
-    "@noble/hashes": "^1.4.0"
+    "@noble/hashes": "^1.4.0",
+    "undici": "^6.19.0"
   },
   "devDependencies": {
     "typescript": "^5.7.0",
@@ -2416,6 +2576,61 @@ MIT
     "node": ">=18"
   }
 }
-""",
-        },
-    ]
+"""
+
+
+STAGES = (
+    _stage_0,
+    _stage_1,
+    _stage_2,
+    _stage_3,
+    _stage_4,
+    _stage_5,
+    _stage_6,
+    _stage_7,
+    _stage_8,
+    _stage_9,
+    _stage_10,
+    _stage_11,
+    _stage_12,
+    _stage_13,
+    _stage_14,
+)
+
+# one-line commit subjects, in stage order
+STAGE_TITLES = (
+    "Scaffold",
+    "Shared constants + RPC + errors",
+    "x402 signing",
+    "Client core",
+    "Client skills",
+    "Skills -- balance + tx",
+    "Skills -- price + wallet + catalog",
+    "Server framework",
+    "OpenClaw manifest",
+    "MCP plugin core",
+    "MCP plugin tools",
+    "MCP plugin config + entry point",
+    "Examples",
+    "Tests",
+    "README + polish",
+)
+
+
+def iter_pinion_os_stages():
+    """Yield each stage as a lazy iterator of (path, content) pairs.
+
+    Stage N+1 is not built until it is requested, so a consumer can
+    write and commit stage N first.
+    """
+    for stage in STAGES:
+        yield stage()
+
+
+@functools.lru_cache(maxsize=None)
+def pinion_os_stages():
+    """Every stage as a read-only {path: content} view, built once per process.
+
+    Use .copy() on the result to get dicts that may be modified.
+    """
+    return FrozenStages(iter_pinion_os_stages())
@@ -0,0 +1,421 @@
+"""
+Skill registry for the pinion-os generator.
+One declaration per skill, compiled into every surface that lists the
+skills: the server catalog, openclaw.plugin.json, the MCP tool table
+and the typed client wrappers. Tables are emitted as frozen module-level
+constants so the generated runtime builds nothing per request.
+"""
+
+import json
+from collections import namedtuple
+
+
+DEFAULT_PRICE = "$0.01"
+NETWORK = "base"
+FACILITATOR_URL = "https://facilitator.payai.network"
+
+# tool_description: wording in the MCP tool schema, if it differs
+Param = namedtuple("Param", "name description type pattern enum items error tool_description")
+Param.__new__.__defaults__ = ("string", None, None, None, None, None)
+
+# catalog_description: wording in the /catalog response, if it differs
+Skill = namedtuple(
+    "Skill",
+    "name method endpoint description tool_description doc example params"
+    " result client_args client_path client_prelude client_body tool_params price"
+    " catalog_description",
+)
+Skill.__new__.__defaults__ = ((), None, None, DEFAULT_PRICE, None)
+
+
+TOKENS = ("ETH", "USDC", "WETH", "DAI", "USDT", "CBETH")
+
+SKILLS = (
+    Skill(
+        name="balance",
+        method="GET",
+        endpoint="/balance/:address",
+        description="Get ETH and USDC balances for any Base address",
+        tool_description="Get ETH and USDC balances for any Ethereum address on Base.",
+        doc="Get ETH and USDC balances for an address on Base.",
+        example="/balance/0x101Cd32b9bEEE93845Ead7Bc604a5F1873330acf",
+        params=(Param(
+            "address", "Ethereum address (0x...)",
+            pattern="^0x[0-9a-fA-F]{40}$", error="invalid ethereum address",
+            tool_description="Ethereum address to check (0x...)",
+        ),),
+        result="BalanceResult",
+        client_args=("address: string",),
+        client_path="`/balance/${address}`",
+    ),
+    Skill(
+        name="tx",
+        method="GET",
+        endpoint="/tx/:hash",
+        description="Get decoded transaction details for any Base transaction",
+        catalog_description="Get decoded transaction details for any Base tx",
+        tool_description="Get decoded transaction details for any Base transaction hash.",
+        doc="Get decoded transaction details for a Base tx hash.",
+        example="/tx/0x...",
+        params=(Param(
+            "hash", "Transaction hash (0x...)",
+            pattern="^0x[0-9a-fA-F]{64}$", error="invalid transaction hash",
+        ),),
+        result="TxResult",
+        client_args=("hash: string",),
+        client_path="`/tx/${hash}`",
+    ),
+    Skill(
+        name="price",
+        method="GET",
+        endpoint="/price/:token",
+        description="Get current USD price for ETH or other Base tokens",
+        catalog_description="Get current USD price for ETH or other tokens",
+        tool_description="Get current USD price for a token on Base (%s)." % ", ".join(TOKENS),
+        doc="Get current USD price for a token (ETH, USDC, WETH, etc).",
+        example="/price/ETH",
+        params=(Param(
+            "token", "Token symbol (%s)" % ", ".join(TOKENS), enum=list(TOKENS),
+            tool_description="Token symbol",
+        ),),
+        result="PriceResult",
+        client_args=("token: string",),
+        client_path="`/price/${token.toUpperCase()}`",
+    ),
+    Skill(
+        name="wallet",
+        method="GET",
+        endpoint="/wallet/generate",
+        description="Generate a fresh Base wallet keypair",
+        tool_description="Generate a fresh Ethereum wallet keypair for the Base network.",
+        doc="Generate a fresh Base wallet keypair.",
+        example="/wallet/generate",
+        params=(),
+        result="WalletResult",
+        client_args=(),
+        client_path='"/wallet/generate"',
+    ),
+    Skill(
+        name="chat",
+        method="POST",
+        endpoint="/chat",
+        description="Chat with the Pinion AI agent",
+        tool_description="Chat with the Pinion AI agent about x402, on-chain data, or the Pinion protocol.",
+        doc="Chat with the Pinion AI agent.",
+        example="POST /chat { messages: [...] }",
+        params=(Param(
+            "messages", "Conversation messages", type="array",
+            items={
+                "type": "object",
+                "properties": {"role": {"type": "string"}, "content": {"type": "string"}},
+            },
+        ),),
+        result="ChatResult",
+        client_args=(
+            "message: string",
+            "history: Array<{ role: string; content: string }> = []",
+        ),
+        client_path='"/chat"',
+        client_prelude=(
+            "const messages = [",
+            "    ...history,",
+            '    { role: "user", content: message },',
+            "];",
+        ),
+        client_body="{ messages }",
+        tool_params=(Param("message", "Your message to the agent"),),
+    ),
+)
+
+
+# ── rendering helpers ────────────────────────────────────────────
+
+def param_schema(p, tool=False):
+    """JSON schema for one param; the tool flavor has no pattern."""
+    schema = {"type": p.type,
+              "description": (tool and p.tool_description) or p.description}
+    if p.pattern and not tool:
+        schema["pattern"] = p.pattern
+    if p.enum:
+        schema["enum"] = list(p.enum)
+    if p.items:
+        schema["items"] = p.items
+    return schema
+
+
+def input_schema(params, tool=False):
+    """Object schema over params; the tool flavor leaves out an empty required."""
+    schema = {
+        "type": "object",
+        "properties": {p.name: param_schema(p, tool) for p in params},
+    }
+    if params or not tool:
+        schema["required"] = [p.name for p in params]
+    return schema
+
+
+def ts_literal(value, level=0, frozen=False):
+    """Render a JSON-able value as a TypeScript literal, 4-space indented.
+
+    With frozen=True every object and array is wrapped in Object.freeze().
+    """
+    pad, inner = "    " * level, "    " * (level + 1)
+    if isinstance(value, dict):
+        if not value:
+            out = "{}"
+        else:
+            lines = [
+                "%s%s: %s," % (inner, k if k.isidentifier() else json.dumps(k),
+                               ts_literal(v, level + 1, frozen))
+                for k, v in value.items()
+            ]
+            out = "{\n" + "\n".join(lines) + "\n" + pad + "}"
+    elif isinstance(value, (list, tuple)):
+        if not value:
+            out = "[]"
+        elif all(not isinstance(v, (dict, list, tuple)) for v in value):
+            out = "[" + ", ".join(ts_literal(v) for v in value) + "]"
+        else:
+            out = "[\n" + "\n".join(
+                "%s%s," % (inner, ts_literal(v, level + 1, frozen)) for v in value
+            ) + "\n" + pad + "]"
+    else:
+        return json.dumps(value)
+    return "Object.freeze(%s)" % out if frozen else out
+
+
+# ── surfaces ─────────────────────────────────────────────────────
+
+def catalog_ts(skills=SKILLS):
+    routes = ts_literal([
+        {
+            "name": s.name,
+            "endpoint": s.endpoint,
+            "method": s.method,
+            "price": s.price,
+            "description": s.catalog_description or s.description,
+            "example": s.example,
+        }
+        for s in skills
+    ], 0, frozen=True)
+    return """// catalog skill -- free endpoint listing available skills
+// generated from the code_gen skill registry
+
+import type { Request, Response } from "express";
+
+export interface CatalogEntry {
+    endpoint: string;
+    method: string;
+    price: string;
+    currency: string;
+    network: string;
+    description: string;
+    example: string;
+}
+
+export interface SkillRoute {
+    readonly name: string;
+    readonly endpoint: string;
+    readonly method: string;
+    readonly price: string;
+    readonly description: string;
+    readonly example: string;
+}
+
+// route table, frozen at module load
+export const SKILL_ROUTES: readonly SkillRoute[] = %s;
+
+export function catalogHandler(payTo: string, network: string) {
+    // the response only depends on payTo and network: serialize it once
+    const skills: CatalogEntry[] = SKILL_ROUTES.map((s) => ({
+        endpoint: s.endpoint,
+        method: s.method,
+        price: s.price,
+        currency: "USDC",
+        network,
+        description: s.description,
+        example: s.example,
+    }));
+    const body = JSON.stringify({ skills, payTo, network });
+
+    return (_req: Request, res: Response) => {
+        res.type("application/json").send(body);
+    };
+}
+""" % routes
+
+
+def openclaw_manifest_json(skills=SKILLS, network=NETWORK):
+    manifest = {
+        "name": "pinion-chain-intel",
+        "version": "1.0.0",
+        "description": "On-chain intelligence for Base -- wallet balances, transaction lookups, and token prices. Paywalled via x402 USDC micropayments.",
+        "author": "Pinion Protocol",
+        "license": "MIT",
+        "homepage": "https://github.com/chu2bard/pinion-os",
+        "skills": [
+            {
+                "name": s.name,
+                "description": s.description,
+                "endpoint": s.endpoint,
+                "method": s.method,
+                "price": s.price,
+                "currency": "USDC",
+                "network": network,
+                "inputSchema": input_schema(s.params),
+            }
+            for s in skills
+        ],
+        "x402": {
+            "facilitator": FACILITATOR_URL,
+            "network": network,
+            "paymentToken": "USDC",
+        },
+    }
+    return json.dumps(manifest, indent=4) + "\n"
+
+
+def _tool_params(s):
+    return s.tool_params if s.tool_params is not None else s.params
+
+
+def plugin_tools_ts(skills=SKILLS):
+    tools = ts_literal([
+        {
+            "name": "pinion_" + s.name,
+            "description": "%s Costs %s USDC via x402." % (s.tool_description, s.price),
+            "inputSchema": input_schema(_tool_params(s), tool=True),
+        }
+        for s in skills
+    ], 0, frozen=True)
+    handlers = "\n".join(
+        "    [\"pinion_%s\", (client, args) => client.skills.%s(%s)]," % (
+            s.name, s.name, ", ".join("args." + p.name for p in _tool_params(s)))
+        for s in skills
+    )
+    return """// tool definitions for Claude MCP integration
+// generated from the code_gen skill registry
+
+import type { PinionClient } from "../client/index.js";
+
+interface ToolDef {
+    readonly name: string;
+    readonly description: string;
+    readonly inputSchema: {
+        readonly type: "object";
+        readonly properties: Readonly<Record<string, any>>;
+        readonly required?: readonly string[];
+    };
+}
+
+type ToolHandler = (
+    client: PinionClient,
+    args: Record<string, any>,
+) => Promise<any>;
+
+// tool list and dispatch table, built (and deeply frozen) once at module load
+const TOOL_DEFINITIONS: readonly ToolDef[] = %s;
+
+const TOOL_HANDLERS: ReadonlyMap<string, ToolHandler> = new Map<string, ToolHandler>([
+%s
+]);
+
+export function getToolDefinitions(): readonly ToolDef[] {
+    return TOOL_DEFINITIONS;
+}
+
+export async function handleToolCall(
+    client: PinionClient,
+    toolName: string,
+    args: Record<string, any>,
+): Promise<{ content: Array<{ type: string; text: string }> }> {
+    const handler = TOOL_HANDLERS.get(toolName);
+    if (!handler) {
+        return {
+            content: [
+                {
+                    type: "text",
+                    text: `unknown tool: ${toolName}`,
+                },
+            ],
+        };
+    }
+
+    try {
+        const result = await handler(client, args);
+
+        const paid =
+            result.paidAmount !== "0"
+                ? ` (paid ${result.paidAmount} wei USDC)`
+                : "";
+
+        return {
+            content: [
+                {
+                    type: "text",
+                    text: JSON.stringify(result.data, null, 2) + paid,
+                },
+            ],
+        };
+    } catch (err: any) {
+        return {
+            content: [
+                { type: "text", text: `error: ${err.message}` },
+            ],
+        };
+    }
+}
+""" % (tools, handlers)
+
+
+def _client_method(s):
+    if len(s.client_args) > 1:
+        sig = "(\n%s\n    )" % "\n".join("        %s," % a for a in s.client_args)
+    else:
+        sig = "(%s)" % "".join(s.client_args)
+    lines = ["    /** %s */" % s.doc,
+             "    async %s%s: Promise<SkillResponse<%s>> {" % (s.name, sig, s.result)]
+    for p in s.params:
+        if p.error and p.pattern:
+            lines += [
+                "        if (!/%s/.test(%s)) {" % (p.pattern, p.name),
+                '            throw new SkillError("%s", "%s");' % (s.name, p.error),
+                "        }",
+            ]
+    lines += ["        " + line for line in s.client_prelude or ()]
+    args = [json.dumps(s.method), s.client_path] + ([s.client_body] if s.client_body else [])
+    call = "        return this.client.request<%s>(%s);" % (s.result, ", ".join(args))
+    # one line while it stays under 80 columns, split like prettier otherwise
+    if len(call) >= 80:
+        call = "\n".join(
+            ["        return this.client.request<%s>(" % s.result]
+            + ["            %s," % a for a in args]
+            + ["        );"]
+        )
+    lines += [call, "    }"]
+    return "\n".join(lines)
+
+
+def client_skills_ts(skills=SKILLS):
+    types = "\n".join("    %s," % s.result for s in skills)
+    methods = "\n\n".join(_client_method(s) for s in skills)
+    return """// typed wrappers for each pinion skill
+// generated from the code_gen skill registry
+
+import type { PinionClient } from "./index.js";
+import { SkillError } from "../shared/errors.js";
+import type {
+%s
+    SkillResponse,
+} from "./types.js";
+
+export class SkillMethods {
+    private client: PinionClient;
+
+    constructor(client: PinionClient) {
+        this.client = client;
+    }
+
+%s
+}
+""" % (types, methods)
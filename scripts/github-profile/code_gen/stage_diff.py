@@ -0,0 +1,106 @@
+"""
+Inter-stage diffs over a StageIndex.
+For each stage: which files were added, modified or rewritten unchanged,
+with line stats against the previous stage's resolved tree. Line diffs
+run only for paths whose content hash changed.
+"""
+
+import difflib
+from collections import namedtuple
+
+from code_gen.materialize import sha256_hex
+
+
+StageChange = namedtuple(
+    "StageChange", "stage added modified unchanged lines_added lines_removed files",
+)
+FileStat = namedtuple("FileStat", "path status added removed")
+
+
+class Digests:
+    """sha256 per distinct body, computed once."""
+
+    def __init__(self):
+        self._memo = {}
+
+    def __call__(self, content):
+        d = self._memo.get(content)
+        if d is None:
+            d = self._memo[content] = sha256_hex(content)
+        return d
+
+
+def line_stats(old, new):
+    """(added, removed) line counts between two bodies."""
+    a, b = old.splitlines(), new.splitlines()
+    added = removed = 0
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != "equal":
+            removed += i2 - i1
+            added += j2 - j1
+    return added, removed
+
+
+def diff_stage(index, k, digest=None):
+    """StageChange for stage k against the resolved tree after stage k-1."""
+    digest = digest or Digests()
+    files = []
+    for path, content in sorted(index.stages[k].items()):
+        prev = index.content_at(path, k - 1) if k > 0 else None
+        if prev is None:
+            files.append(FileStat(path, "added", len(content.splitlines()), 0))
+        elif digest(prev) == digest(content):
+            files.append(FileStat(path, "unchanged", 0, 0))
+        else:
+            files.append(FileStat(path, "modified", *line_stats(prev, content)))
+    by = lambda status: [f.path for f in files if f.status == status]
+    return StageChange(
+        k, by("added"), by("modified"), by("unchanged"),
+        sum(f.added for f in files), sum(f.removed for f in files), files,
+    )
+
+
+def diff_stages(index):
+    digest = Digests()
+    return [diff_stage(index, k, digest) for k in range(len(index))]
+
+
+def summary(change):
+    """One-line stats, e.g. for a commit message body."""
+    parts = []
+    for label, paths in (("added", change.added), ("modified", change.modified),
+                         ("unchanged", change.unchanged)):
+        if paths:
+            parts.append("%d %s" % (len(paths), label))
+    return "%s; +%d/-%d lines" % (", ".join(parts) or "no files",
+                                  change.lines_added, change.lines_removed)
+
+
+def commit_message(change, title=None):
+    lines = [title or "stage %d" % change.stage, "", summary(change), ""]
+    lines += ["%s %s (+%d/-%d)" % (f.status[0].upper(), f.path, f.added, f.removed)
+              for f in change.files]
+    return "\n".join(lines) + "\n"
+
+
+def drift(index, trees, upto=None):
+    """Compare stages against recorded [{path: digest}, ...] trees.
+
+    trees is the BlobStore snapshot format. Returns [(stage, path, why)]
+    for every stage <= upto whose files no longer hash the same.
+    """
+    digest = Digests()
+    out = []
+    last = len(index) - 1 if upto is None else upto
+    for k in range(min(last + 1, max(len(index), len(trees)))):
+        old = trees[k] if k < len(trees) else {}
+        new = index.stages[k] if k < len(index) else {}
+        for path in sorted(set(old) | set(new)):
+            if path not in new:
+                out.append((k, path, "removed"))
+            elif path not in old:
+                out.append((k, path, "added"))
+            elif old[path] != digest(new[path]):
+                out.append((k, path, "changed"))
+    return out
@@ -0,0 +1,72 @@
+"""
+Resolved-tree index over a list of stages.
+Built once; answers "content of path P at stage K", "who writes P" and
+"final tree" without re-folding every stage per query.
+"""
+
+from types import MappingProxyType
+
+from code_gen.materialize import iter_files
+
+
+class StageIndex:
+    """Path -> ordered writing stages, plus per-stage resolved content."""
+
+    def __init__(self, stages):
+        # read-only views (FrozenStages) are shared, anything else is copied
+        self.stages = [
+            files if isinstance(files, MappingProxyType) else dict(iter_files(files))
+            for files in stages
+        ]
+        n = len(self.stages)
+        self.writers = {}
+        self._at = {}
+        for k, files in enumerate(self.stages):
+            for path, content in files.items():
+                if path not in self._at:
+                    self._at[path] = [None] * n
+                    self.writers[path] = []
+                self.writers[path].append(k)
+                self._at[path][k] = content
+        # forward-fill so _at[path][k] is the resolved content at stage k
+        for slots in self._at.values():
+            for k in range(1, n):
+                if slots[k] is None:
+                    slots[k] = slots[k - 1]
+        self.final = {p: slots[-1] for p, slots in self._at.items()}
+        self._trees = {}
+
+    def __len__(self):
+        return len(self.stages)
+
+    def paths(self):
+        return self.writers.keys()
+
+    def content_at(self, path, k):
+        """Resolved content of path after stage k, or None if not yet written."""
+        slots = self._at.get(path)
+        return slots[k] if slots else None
+
+    def last_writer(self, path, k=None):
+        """Index of the last stage <= k (default: any) that wrote path."""
+        ks = self.writers.get(path)
+        if not ks:
+            return None
+        if k is None:
+            return ks[-1]
+        hits = [w for w in ks if w <= k]
+        return hits[-1] if hits else None
+
+    def rewritten(self):
+        """Paths written by more than one stage."""
+        return {p: ks for p, ks in self.writers.items() if len(ks) > 1}
+
+    def tree_at(self, k):
+        """Resolved {path: content} after stage k (cached)."""
+        if k < 0:
+            k += len(self.stages)
+        tree = self._trees.get(k)
+        if tree is None:
+            tree = {p: s[k] for p, s in self._at.items() if s[k] is not None}
+            self._trees[k] = tree
+        return tree
@@ -0,0 +1,135 @@
+"""
+Structural validation of generated stages.
+Every emitted JSON file must parse, and every relative import in the
+TypeScript sources must resolve to a file present at that stage. Files
+are analysed once per content hash (on a process pool, cached on disk);
+resolution against each stage's tree is then a set lookup.
+"""
+
+import json, os, posixpath, re
+from collections import namedtuple
+
+from code_gen.materialize import cache_dir
+from code_gen.stage_diff import Digests
+
+
+Problem = namedtuple("Problem", "stage path message")
+
+IMPORT_RE = re.compile(
+    r"""(?:\b(?:import|export)\b[^;'"`]*?\bfrom\s*|\bimport\s*\(?\s*|\brequire\s*\(\s*)"""
+    r"""["'](\.{1,2}/[^"']+)["']""",
+)
+TS_EXTS = (".ts", ".tsx", ".mts")
+CACHE_VERSION = 1
+
+
+def analyse(path, content):
+    """Per-file facts that depend only on content; runs in pool workers."""
+    if path.endswith(".json"):
+        try:
+            json.loads(content)
+        except ValueError as e:
+            return {"error": "invalid JSON: %s" % e}
+        return {}
+    if path.endswith(TS_EXTS):
+        return {"imports": sorted(set(IMPORT_RE.findall(content)))}
+    return {}
+
+
+def _analyse_args(args):
+    return analyse(*args)
+
+
+def candidates(importer, spec):
+    """Tree paths that would satisfy spec imported from importer (Node16 rules)."""
+    target = posixpath.normpath(posixpath.join(posixpath.dirname(importer), spec))
+    stem, ext = posixpath.splitext(target)
+    if ext == ".js":
+        return [stem + ".ts", stem + ".tsx", target]
+    if ext == ".mjs":
+        return [stem + ".mts", target]
+    return [target]
+
+
+class Validator:
+    """Validates stage trees, remembering analyses by content hash."""
+
+    def __init__(self, jobs=1, cache_path=None):
+        self.jobs = jobs
+        self.cache_path = cache_path or os.path.join(cache_dir("validate"), "results.json")
+        self.results = {}
+        try:
+            with open(self.cache_path) as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self.results = data["results"]
+        except (OSError, ValueError, KeyError):
+            pass
+        self._dirty = False
+        self._digest = Digests()
+
+    def _key(self, path, content):
+        # the extension decides how a body is analysed, so it is part of the key
+        return "%s:%s" % (os.path.splitext(path)[1], self._digest(content))
+
+    def _fill(self, files):
+        """Analyse every (path, content) whose digest isn't cached yet."""
+        todo = {}
+        for path, content in files:
+            key = self._key(path, content)
+            if key not in self.results and key not in todo:
+                todo[key] = (path, content)
+        if not todo:
+            return
+        keys, args = list(todo), list(todo.values())
+        if self.jobs > 1 and len(args) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                out = list(pool.map(_analyse_args, args, chunksize=max(1, len(args) // (self.jobs * 4))))
+        else:
+            out = [analyse(*a) for a in args]
+        self.results.update(zip(keys, out))
+        self._dirty = True
+
+    def result(self, path, content):
+        return self.results[self._key(path, content)]
+
+    def check_tree(self, tree, stage=None):
+        """Problems in one resolved {path: content} tree."""
+        self._fill(tree.items())
+        problems = []
+        for path in sorted(tree):
+            res = self.result(path, tree[path])
+            if "error" in res:
+                problems.append(Problem(stage, path, res["error"]))
+            for spec in res.get("imports", ()):
+                if not any(c in tree for c in candidates(path, spec)):
+                    problems.append(Problem(stage, path, "unresolved import %r" % spec))
+        return problems
+
+    def check_index(self, index):
+        """Problems at every stage of a StageIndex."""
+        self._fill((p, c) for files in index.stages for p, c in files.items())
+        problems = []
+        for k in range(len(index)):
+            problems += self.check_tree(index.tree_at(k), k)
+        return problems
+
+    def save(self):
+        if not self._dirty:
+            return
+        tmp = "%s.%d.tmp" % (self.cache_path, os.getpid())
+        with open(tmp, "w") as f:
+            json.dump({"version": CACHE_VERSION, "results": self.results}, f)
+        os.replace(tmp, self.cache_path)
+        self._dirty = False
+
+
+def first_seen(problems):
+    """Collapse problems that persist across stages to the first stage hit."""
+    seen, out = set(), []
+    for p in problems:
+        if (p.path, p.message) not in seen:
+            seen.add((p.path, p.message))
+            out.append(p)
+    return out
@@ -0,0 +1,148 @@
+"""
+Multi-variant rendering of generated stages.
+A generator lists the literals that differ between published flavors
+(network, default price, ...) as SLOTS. Each file body is compiled once
+into a format string with those literals cut out, then rendered for
+every variant by plain %-formatting.
+
+    python -m code_gen.cli variants pinion_os out/ \\
+        --variant sepolia:network=base-sepolia --variant premium:price=$0.05
+"""
+
+import fnmatch, os, re
+from collections import namedtuple
+
+from code_gen.materialize import iter_files, resolve, write_files
+
+
+# patterns: regexes whose group 1 spans the literal; skip: path globs left alone
+Slot = namedtuple("Slot", "name default patterns valid skip")
+Slot.__new__.__defaults__ = (r"[^\s\"'\\]+", ())
+
+Template = namedtuple("Template", "fmt order")
+
+Variant = namedtuple("Variant", "name values")
+
+
+def _spans(content, path, slots):
+    """Non-overlapping (start, end, slot index) for every slot literal in content."""
+    found = []
+    for i, slot in enumerate(slots):
+        if any(fnmatch.fnmatch(path, g) for g in slot.skip):
+            continue
+        for pattern in slot.patterns:
+            for m in re.finditer(pattern, content):
+                if m.group(1) == slot.default:
+                    found.append((m.start(1), m.end(1), i))
+    spans, end = [], 0
+    for span in sorted(found):
+        if span[0] >= end:
+            spans.append(span)
+            end = span[1]
+    return spans
+
+
+def compile_body(path, content, slots):
+    """content as a Template, or unchanged if no slot occurs in it."""
+    if not isinstance(content, str):
+        return content
+    spans = _spans(content, path, slots)
+    if not spans:
+        return content
+    parts, pos = [], 0
+    for start, end, _ in spans:
+        parts.append(content[pos:start].replace("%", "%%"))
+        parts.append("%s")
+        pos = end
+    parts.append(content[pos:].replace("%", "%%"))
+    return Template("".join(parts), tuple(i for _, _, i in spans))
+
+
+class Compiler:
+    """Compiles bodies against a slot table, once per distinct (path, body)."""
+
+    def __init__(self, slots):
+        self.slots = tuple(slots)
+        self._cache = {}
+        self.compiled = 0
+
+    def __call__(self, path, content):
+        key = (path, content)
+        t = self._cache.get(key)
+        if t is None:
+            t = self._cache[key] = compile_body(path, content, self.slots)
+            self.compiled += 1
+        return t
+
+    def values(self, variant):
+        """Slot values for variant, in slot order."""
+        unknown = set(variant.values) - {s.name for s in self.slots}
+        if unknown:
+            raise ValueError("%s: unknown slot(s) %s" % (variant.name, ", ".join(sorted(unknown))))
+        out = []
+        for s in self.slots:
+            value = variant.values.get(s.name, s.default)
+            if not re.fullmatch(s.valid, value):
+                raise ValueError("%s: bad %s value %r" % (variant.name, s.name, value))
+            out.append(value)
+        return tuple(out)
+
+
+def render(template, values):
+    """Body of a compiled template for one tuple of slot values."""
+    if not isinstance(template, Template):
+        return template
+    return template.fmt % tuple(values[i] for i in template.order)
+
+
+def render_stages(stages, slots, variants):
+    """Render every variant in one pass over stages.
+
+    Returns {variant name: [{path: content}, ...]}; bodies are compiled
+    once and shared by every variant they are unchanged in.
+    """
+    compiler = Compiler(slots)
+    values = [(v.name, compiler.values(v)) for v in variants]
+    out = {name: [] for name, _ in values}
+    for files in stages:
+        compiled = [(rel, compiler(rel, content)) for rel, content in iter_files(files)]
+        for name, vals in values:
+            out[name].append({rel: render(t, vals) for rel, t in compiled})
+    return out
+
+
+def render_tree(tree, slots, variants):
+    """{variant name: {path: content}} for one resolved tree."""
+    compiler = Compiler(slots)
+    values = [(v.name, compiler.values(v)) for v in variants]
+    compiled = [(rel, compiler(rel, content)) for rel, content in tree.items()]
+    return {name: {rel: render(t, vals) for rel, t in compiled} for name, vals in values}
+
+
+def parse_variant(text):
+    """'name:key=value,key=value' -> Variant; a bare name keeps the defaults."""
+    name, _, spec = text.partition(":")
+    if not name:
+        raise ValueError("variant needs a name: %r" % text)
+    values = {}
+    for item in filter(None, spec.split(",")):
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError("expected key=value in %r" % item)
+        values[key.strip()] = value.strip()
+    return Variant(name, values)
+
+
+def write_variants(gen, out_root, variants, upto=None, jobs=1):
+    """Write each variant of gen's resolved tree to out_root/<name>.
+
+    Returns {variant name: written paths}.
+    """
+    trees = render_tree(resolve(gen.stages(), upto), gen.slots, variants)
+    written = {}
+    for name, tree in trees.items():
+        written[name] = write_files(
+            os.path.join(out_root, name), tree, jobs=jobs, assets=gen.assets,
+            prune_stale=True,
+        )
+    return written
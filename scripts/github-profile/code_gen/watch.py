@@ -0,0 +1,70 @@
+"""
+Watch mode.
+Polls the generator sources and assets, re-evaluates the stages when
+any of them change, and rewrites only the files whose content changed.
+"""
+
+import os, time
+
+from code_gen.generators import load, reload
+from code_gen.materialize import (
+    Manifest, iter_files, prune, resolve, sha256_hex, write_files,
+)
+from code_gen.pack import source_files
+
+
+def _mtimes(paths):
+    out = {}
+    for path in paths:
+        try:
+            out[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            out[path] = None
+    return out
+
+
+def _stage_digests(stages):
+    return [
+        {rel: sha256_hex(content) for rel, content in files.items()}
+        for files in stages
+    ]
+
+
+def watch(name, out, upto=None, interval=0.2, jobs=1, log=print, iterations=None):
+    """Keep out in sync with generator name until interrupted.
+
+    Each pass costs one stat per watched file. A change re-imports the
+    generator, and only stages whose digests moved are reported and only
+    changed files are written; files no longer generated are removed.
+    Errors while a source is mid-edit are logged and the previous output
+    is left in place.
+    """
+    gen = load(name)
+    paths = source_files(name) + sorted(gen.assets.values())
+    manifest = Manifest(out)
+    seen, prev = None, []
+    n = 0
+    while iterations is None or n < iterations:
+        n += 1
+        now = _mtimes(paths)
+        if now != seen:
+            first, seen = seen is None, now
+            t0 = time.perf_counter()
+            try:
+                gen = gen if first else reload(name)
+                stages = [dict(iter_files(files)) for files in gen.stages()]
+                digests = _stage_digests(stages)
+                tree = resolve(stages, upto)
+                written = write_files(out, tree, manifest, jobs=jobs, assets=gen.assets)
+                removed = prune(out, set(tree) | set(gen.assets), manifest)
+                manifest.save()
+            except Exception as e:
+                log("%s: error, keeping previous output: %s" % (name, e))
+            else:
+                changed = [k for k, d in enumerate(digests) if k >= len(prev) or prev[k] != d]
+                prev = digests
+                log("%s: %d stage(s) changed %s, %d file(s) written, %d removed in %.0f ms" % (
+                    name, len(changed), changed if len(changed) < len(digests) else "(all)",
+                    len(written), len(removed), (time.perf_counter() - t0) * 1e3))
+                paths = source_files(name) + sorted(gen.assets.values())
+        time.sleep(interval)
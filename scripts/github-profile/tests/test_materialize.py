@@ -0,0 +1,88 @@
+"""
+Manifest-driven writes and pruning (code_gen.materialize).
+
+    cd scripts/github-profile && python -m pytest tests
+"""
+
+import os
+
+import pytest
+
+from code_gen.materialize import Manifest, write_files
+
+
+TREE = {
+    "README.md": "# demo\n",
+    "src/index.ts": "export {};\n",
+    "src/old/gone.ts": "export const gone = 1;\n",
+}
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    # keep manifests out of the real cache
+    monkeypatch.setenv("CODE_GEN_CACHE", str(tmp_path / "cache"))
+    return str(tmp_path / "repo")
+
+
+def _read(repo, rel):
+    with open(os.path.join(repo, rel)) as f:
+        return f.read()
+
+
+def _edit(repo, rel, text):
+    with open(os.path.join(repo, rel), "w") as f:
+        f.write(text)
+
+
+def test_second_run_writes_nothing(repo):
+    assert sorted(write_files(repo, TREE)) == sorted(TREE)
+    assert write_files(repo, TREE) == []
+    assert Manifest(repo).entries.keys() == TREE.keys()
+
+
+def test_external_edit_is_rewritten(repo):
+    write_files(repo, TREE)
+    _edit(repo, "src/index.ts", "export const edited = true;\n")
+    assert write_files(repo, TREE) == ["src/index.ts"]
+    assert _read(repo, "src/index.ts") == TREE["src/index.ts"]
+
+
+def test_changed_content_is_rewritten(repo):
+    write_files(repo, TREE)
+    tree = dict(TREE, **{"README.md": "# demo v2\n"})
+    assert write_files(repo, tree) == ["README.md"]
+    assert _read(repo, "README.md") == "# demo v2\n"
+
+
+def test_prune_removes_dropped_paths(repo):
+    write_files(repo, TREE)
+    tree = {k: v for k, v in TREE.items() if k != "src/old/gone.ts"}
+    write_files(repo, tree, prune_stale=True)
+    assert not os.path.exists(os.path.join(repo, "src/old/gone.ts"))
+    # emptied directories go with it
+    assert not os.path.exists(os.path.join(repo, "src/old"))
+    assert "src/old/gone.ts" not in Manifest(repo).entries
+
+
+def test_prune_keeps_user_edited_files(repo):
+    write_files(repo, TREE)
+    _edit(repo, "src/old/gone.ts", "export const mine = 2;\n")
+    tree = {k: v for k, v in TREE.items() if k != "src/old/gone.ts"}
+    write_files(repo, tree, prune_stale=True)
+    assert _read(repo, "src/old/gone.ts") == "export const mine = 2;\n"
+    # no longer tracked, so a later run never deletes it either
+    assert "src/old/gone.ts" not in Manifest(repo).entries
+
+
+def test_prune_leaves_untracked_files(repo):
+    write_files(repo, TREE)
+    _edit(repo, "notes.txt", "scratch\n")
+    write_files(repo, TREE, prune_stale=True)
+    assert os.path.exists(os.path.join(repo, "notes.txt"))
+
+
+def test_no_prune_without_flag(repo):
+    write_files(repo, TREE)
+    write_files(repo, {"README.md": TREE["README.md"]})
+    assert os.path.exists(os.path.join(repo, "src/old/gone.ts"))
@@ -0,0 +1,76 @@
+"""
+Slot rendering of the pinion_os tree (code_gen.variants, pinion_os.SLOTS).
+
+    cd scripts/github-profile && python -m pytest tests
+"""
+
+import pytest
+
+from code_gen import pinion_os
+from code_gen.materialize import resolve
+from code_gen.variants import Variant, render_tree
+
+
+VALUES = {
+    "network": "base-sepolia",
+    "price": "$0.05",
+    "port": "5050",
+    "version": "1.2.3",
+}
+
+
+@pytest.fixture(scope="module")
+def tree():
+    return resolve(pinion_os.pinion_os_stages())
+
+
+@pytest.fixture(scope="module")
+def rendered(tree):
+    return render_tree(tree, pinion_os.SLOTS, [Variant("default", {}), Variant("alt", VALUES)])
+
+
+def _texts(tree):
+    return {path: c for path, c in tree.items() if isinstance(c, str)}
+
+
+def test_default_variant_is_unchanged(tree, rendered):
+    assert rendered["default"] == tree
+
+
+def test_network_leaves_no_stray_default(rendered):
+    for path, content in _texts(rendered["alt"]).items():
+        if path == "package.json":
+            continue
+        for line in content.splitlines():
+            # doc comments name both networks and are left alone
+            if '"base"' in line:
+                assert '"base-sepolia"' in line, "%s: %s" % (path, line)
+
+
+def test_network_skips_package_json_keyword(tree, rendered):
+    assert '    "base",\n' in tree["package.json"]
+    assert '    "base",\n' in rendered["alt"]["package.json"]
+
+
+def test_network_reaches_sdk_defaults(rendered):
+    files = rendered["alt"]
+    assert 'const NETWORK = "base-sepolia";' in files["src/skills/balance.ts"]
+    assert 'const NETWORK = "base-sepolia";' in files["src/skills/wallet.ts"]
+
+
+@pytest.mark.parametrize("slot, default, path", [
+    ("price", "$0.01", "src/shared/constants.ts"),
+    ("port", "4020", "src/server/index.ts"),
+    ("version", "0.2.0", "package.json"),
+])
+def test_slot_substitutes(tree, rendered, slot, default, path):
+    assert default in tree[path]
+    assert VALUES[slot] in rendered["alt"][path]
+    assert not any(default in c for c in _texts(rendered["alt"]).values())
+
+
+def test_bad_value_is_rejected(tree):
+    with pytest.raises(ValueError):
+        render_tree(tree, pinion_os.SLOTS, [Variant("bad", {"network": "Base Sepolia"})])
+    with pytest.raises(ValueError):
+        render_tree(tree, pinion_os.SLOTS, [Variant("bad", {"chain": "8453"})])